@@ -0,0 +1,482 @@
+#!/usr/bin/python3
+
+import argparse
+import gc
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlsplit
+
+import international_showtimes_api as isa
+
+
+def _showtime_payload(i):
+    return {'id': f'{i}', 'cinema_id': f'{i % 500}', 'movie_id': f'{i % 200}',
+            'start_at': '2020-03-05T19:30:00-05:00', 'auditorium': f'Auditorium {i % 12}', 'is_3d': i % 4 == 0,
+            'is_imax': i % 9 == 0, 'language': 'en', 'subtitle_language': None,
+            'cinema_movie_title': f'Movie {i % 200}', 'booking_type': 'external',
+            'booking_link': f'https://tickets.example.com/showtimes/{i}'}
+
+
+def _city_name(city_id: int):
+    # one city in nine is an Atlanta, so city searches resolve to several ids
+    return ('Atlanta' if city_id % 9 == 0 else f'City {city_id}')
+
+
+def _cinema_payload(i):
+    return {'id': f'{i}', 'slug': f'cinema-{i}', 'name': f'Cinema {i}', 'chain_id': f'{i % 40}',
+            'city_id': f'{i % 90}', 'telephone': '+1 404 555 0100', 'email': f'info{i}@example.com',
+            'website': f'https://cinema{i}.example.com', 'booking_type': 'external',
+            'location': {'lat': 33.7 + i / 1000, 'lon': -84.3 - i / 1000,
+                         'address': {'display_text': f'{i} Peachtree St, Atlanta, GA 30303', 'street': 'Peachtree St',
+                                     'house': f'{i}', 'zipcode': '30303', 'city': _city_name(i % 90), 'state': 'Georgia',
+                                     'state_abbr': 'GA', 'country': 'United States', 'country_code': 'US'}}}
+
+
+def _movie_payload(i):
+    return {'id': f'{i}', 'slug': f'movie-{i}', 'title': f'Movie {i}', 'original_title': f'Movie {i}',
+            'original_language': 'en', 'synopsis': 'A long synopsis. ' * 20,
+            'poster_image': f'https://images.example.com/{i}.jpg',
+            'poster_image_thumbnail': f'https://images.example.com/{i}_thumb.jpg', 'runtime': 120,
+            'genres': [{'id': f'{g}', 'name': f'Genre {g}'} for g in range(3)],
+            'trailers': [{'language': 'en', 'is_official': True,
+                          'trailer_files': [{'url': f'https://videos.example.com/{i}.mp4', 'format': 'mp4'}]}],
+            'ratings': {'imdb': {'value': 7.1, 'vote_count': 1000}, 'tmdb': {'value': 6.9, 'vote_count': 500}},
+            'age_limits': {'US': 'PG-13'}, 'website': f'https://movie{i}.example.com',
+            'production_companies': ['Studio'], 'keywords': ['action', 'drama'], 'imdb_id': f'tt{i:07d}',
+            'tmdb_id': i, 'rentrak_film_id': i,
+            'cast': [{'id': f'{p}', 'name': f'Actor {p}', 'character': f'Role {p}'} for p in range(10)],
+            'crew': [{'id': f'{p}', 'name': f'Crew {p}', 'job': 'Director'} for p in range(3)]}
+
+
+def _chain_payload(i):
+    return {'id': f'{i}', 'name': f'Chain {i}', 'websites': [f'https://chain{i}.example.com'], 'countries': ['US']}
+
+
+def _genre_payload(i):
+    return {'id': f'{i}', 'name': f'Genre {i}'}
+
+
+def _city_payload(i):
+    return {'id': f'{i}', 'slug': f'city-{i}', 'name': _city_name(i), 'country_code': 'US',
+            'lat': 33.7 + i / 100, 'lon': -84.3 - i / 100}
+
+
+# endpoint -> (payload builder, records in a typical response)
+ENDPOINTS = {
+    'showtimes': (_showtime_payload, 5000),
+    'cinemas': (_cinema_payload, 2000),
+    'movies': (_movie_payload, 300),
+    'chains': (_chain_payload, 500),
+    'genres': (_genre_payload, 30),
+    'cities': (_city_payload, 90),
+}
+
+MODELS = {
+    'showtime': (_showtime_payload, lambda data, parent: isa.Showtime(data, parent, skip_additional_api_calls=True)),
+    'cinema': (_cinema_payload, isa.Cinema),
+    'movie': (_movie_payload, lambda data, parent: isa.Movie(data, parent, lazy=False)),
+}
+
+
+class _Response:
+    """
+    Just enough of requests.Response for the client: truthy on success, content, headers, iter_content()
+    """
+
+    def __init__(self, status_code: int, content: bytes = b'', headers: dict = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = (headers if headers else {})
+
+    def __bool__(self):
+        return self.status_code < 400
+
+    def iter_content(self, chunk_size: int = 1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+def _scaled(records: list, scale: float):
+    """
+    Grow or shrink recorded records to scale times as many, giving the copies distinct ids
+    """
+    count = int(len(records) * scale)
+    results = []
+    for i in range(count):
+        record = records[i % len(records)]
+        copy_number = i // len(records)
+        if copy_number:
+            record = {**record, 'id': f"{record['id']}-{copy_number}"}
+        results.append(record)
+    return results
+
+
+class ReplayTransport:
+    """
+    Offline stand-in for the API that answers /movies, /cinemas, /showtimes, /chains, /genres and /cities
+
+    Serves the records recorded into a fixtures directory (see record()), or synthetic ones when no recording is
+    given, and understands the query parameters the client sends: ids, cinema_id, movie_id, city_ids, search_query,
+    location/distance, append, fields, time_from/time_to, page/per_page (with meta_info) and If-None-Match. Drop it in wherever
+    InternationalShowtimes takes a transport.
+    """
+
+    def __init__(self, fixtures: str = None, latency: float = 0.0, scale: float = 1.0, max_per_page: int = 100):
+        """
+
+        :param fixtures: directory of <endpoint>.json files written by record(); synthetic records if None
+        :param latency: seconds each request takes, as if spent on the network
+        :param scale: multiplies the number of records of every endpoint
+        :param max_per_page: largest page served, whatever per_page asks for
+        """
+        self.latency = latency
+        self.max_per_page = max_per_page
+        self.records = {}
+        now = time.time()
+        for endpoint, (make_payload, count) in ENDPOINTS.items():
+            path = (os.path.join(fixtures, f'{endpoint}.json') if fixtures else None)
+            if path and os.path.exists(path):
+                with open(path) as file:
+                    self.records[endpoint] = _scaled(json.load(file).get(endpoint) or [], scale)
+                continue
+            records = [make_payload(i) for i in range(max(1, int(count * scale)))]
+            if endpoint == 'showtimes':  # spread over the next day, so "upcoming" filters keep them
+                for i, record in enumerate(records):
+                    start = datetime.fromtimestamp(now + 600 + (i % 144) * 600, timezone.utc)
+                    record['start_at'] = start.isoformat(timespec='seconds')
+            self.records[endpoint] = records
+        self._by_id = {endpoint: {record['id']: record for record in records}
+                       for endpoint, records in self.records.items()}
+        self._starts = {record['id']: isa._parse_timestamp(record.get('start_at'))
+                        for record in self.records['showtimes']}
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.bytes_sent = 0
+
+    def _select(self, endpoint: str, item_id: str, params: dict):
+        if item_id:
+            records = [self._by_id[endpoint][item_id]] if item_id in self._by_id[endpoint] else []
+        elif params.get('ids'):
+            records = [self._by_id[endpoint][key] for key in params['ids'].split(',') if key in self._by_id[endpoint]]
+        else:
+            records = self.records[endpoint]
+        for name in ('cinema_id', 'movie_id'):
+            if params.get(name):
+                records = [record for record in records if record.get(name) == params[name]]
+        if params.get('city_ids'):
+            city_ids = set(params['city_ids'].split(','))
+            records = [record for record in records if record.get('city_id') in city_ids]
+        if params.get('search_query'):
+            wanted = params['search_query'].casefold()
+            field = params.get('search_field', 'name')
+            records = [record for record in records if wanted in str(record.get(field, '')).casefold()]
+        if params.get('location') and params.get('distance'):
+            lat, lon = (float(value) for value in params['location'].split(','))
+            records = [record for record in records if record.get('location') and isa._haversine_km(
+                lat, lon, record['location']['lat'], record['location']['lon']) <= float(params['distance'])]
+        if endpoint == 'showtimes' and (params.get('time_from') or params.get('time_to')):
+            time_from = float(params.get('time_from') or '-inf')
+            time_to = float(params.get('time_to') or 'inf')
+            records = [record for record in records
+                       if self._starts[record['id']] is None or time_from <= self._starts[record['id']] < time_to]
+        return records
+
+    def _body(self, url: str):
+        parts = urlsplit(url)
+        segments = parts.path.rstrip('/').split('/')
+        if segments[-1] in self.records:
+            endpoint, item_id = segments[-1], None
+        elif len(segments) > 1 and segments[-2] in self.records:
+            endpoint, item_id = segments[-2], segments[-1]
+        else:
+            return None
+        query = parse_qsl(parts.query)
+        params = dict(query)
+        records = self._select(endpoint, item_id, params)
+        total = len(records)
+        page = int(params.get('page', 1))
+        per_page = min(int(params.get('per_page', self.max_per_page)), self.max_per_page)
+        records = records[(page - 1) * per_page:page * per_page]
+        envelope = {endpoint: records}
+        for name, value in query:
+            if name == 'append' and value in self.records:
+                ids = {record.get(f'{value[:-1]}_id') for record in records}
+                envelope[value] = [self._by_id[value][key] for key in sorted(ids, key=str) if key in self._by_id[value]]
+        if params.get('fields'):
+            fields = params['fields'].split(',')
+            envelope[endpoint] = [{field: record[field] for field in fields if field in record} for record in records]
+        envelope['meta_info'] = {'total_count': total, 'page': page, 'per_page': per_page}
+        return endpoint, json.dumps(envelope).encode()
+
+    def get(self, url, headers=None, payload: dict = None, stream: bool = False):
+        if self.latency:
+            time.sleep(self.latency)
+        found = self._body(url)
+        endpoint, body = (found if found else ('unknown', None))
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        if body is None:
+            return _Response(404)
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if headers and headers.get('If-None-Match') == etag:
+            return _Response(304, headers={'ETag': etag})
+        with self._lock:
+            self.bytes_sent += len(body)
+        return _Response(200, body, {'ETag': etag, 'Content-Type': 'application/json'})
+
+    def request_count(self):
+        with self._lock:
+            return sum(self.requests.values())
+
+
+def record(api_key: str, directory: str, countries: str = None):
+    """
+    Record live responses of every replayed endpoint into directory, for ReplayTransport(fixtures=directory)
+
+    :param api_key:
+    :param directory:
+    :param countries: e.g. 'US', to keep the showtimes and cinemas recordings to a manageable size
+    """
+    os.makedirs(directory, exist_ok=True)
+    client = isa.InternationalShowtimes(api_key=api_key, lazy=True, conditional_requests=False)
+    for endpoint in ENDPOINTS:
+        query = f'{client.baseUrl}/{endpoint}?lang={client.language}'
+        if countries and endpoint in ('cinemas', 'showtimes', 'chains', 'cities'):
+            query += f'&countries={countries}'
+        envelope = client._get_all_pages(query, endpoint)
+        records = (envelope.get(endpoint) or [] if envelope else [])
+        with open(os.path.join(directory, f'{endpoint}.json'), 'w') as file:
+            json.dump({endpoint: records}, file)
+        print(f"{endpoint:<12}{len(records):>8} records")
+
+
+def _workflow_startup(transport):
+    isa.InternationalShowtimes(api_key='benchmark', transport=transport)
+
+
+def _workflow_cinemas_by_city(transport):
+    client = isa.InternationalShowtimes(api_key='benchmark', transport=transport, lazy=True)
+    for _ in range(5):
+        client.get_cinemas(city='Atlanta', zip_code='30303')
+
+
+def _workflow_nearby_cinemas(transport):
+    client = isa.InternationalShowtimes(api_key='benchmark', transport=transport, lazy=True)
+    for i in range(50):
+        client.get_cinemas(latitude=33.8 + i / 500, longitude=-84.4 - i / 500, nearest=5)
+
+
+def _workflow_showtimes_for_cinemas(transport):
+    client = isa.InternationalShowtimes(api_key='benchmark', transport=transport, lazy=True)
+    for i in range(20):
+        client.get_showtimes(cinema=isa.Cinema({'id': f'{i}'}, None))
+
+
+def _workflow_showtimes_for_movie(transport):
+    client = isa.InternationalShowtimes(api_key='benchmark', transport=transport, lazy=True)
+    client.get_showtimes(movie=isa.Movie({'id': '1'}, None, lazy=True))
+
+
+def _workflow_stream_showtimes(transport):
+    client = isa.InternationalShowtimes(api_key='benchmark', transport=transport, lazy=True)
+    for _ in client.iter_showtimes(skip_cinemas=True):
+        pass
+
+
+def _workflow_reference_lookups(transport):
+    client = isa.InternationalShowtimes(api_key='benchmark', transport=transport, lazy=True)
+    for i in range(50):
+        client.get_genre(genre_name=f'Genre {i % 40}')
+        client.get_chain(chain_name=f'Chain {i % 600}')
+        client.get_all_current_movies()
+
+
+def _workflow_sync_showtimes(transport):
+    client = isa.InternationalShowtimes(api_key='benchmark', transport=transport, lazy=True)
+    for _ in range(5):
+        client.sync_showtimes(cinema=isa.Cinema({'id': '1'}, None))
+
+
+WORKFLOWS = {
+    'startup': _workflow_startup,
+    'cinemas_by_city': _workflow_cinemas_by_city,
+    'nearby_cinemas': _workflow_nearby_cinemas,
+    'showtimes_for_cinemas': _workflow_showtimes_for_cinemas,
+    'showtimes_for_movie': _workflow_showtimes_for_movie,
+    'stream_showtimes': _workflow_stream_showtimes,
+    'reference_lookups': _workflow_reference_lookups,
+    'sync_showtimes': _workflow_sync_showtimes,
+}
+
+
+def _peak_rss_kb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return (peak // 1024 if sys.platform == 'darwin' else peak)  # bytes on macOS, KB elsewhere
+
+
+def _run_workflow(name: str, replay_options: dict, results):
+    """
+    Run one workflow in this (fresh) process: a timed pass, then a traced pass for allocations
+    """
+    transport = ReplayTransport(**replay_options)
+    gc.collect()
+    started = time.perf_counter()
+    WORKFLOWS[name](transport)
+    wall = time.perf_counter() - started
+    requests = transport.request_count()
+    peak_rss = _peak_rss_kb()
+    transport = ReplayTransport(**replay_options)
+    gc.collect()
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    WORKFLOWS[name](transport)
+    _, peak_traced = tracemalloc.get_traced_memory()
+    objects = sys.getallocatedblocks() - blocks_before
+    tracemalloc.stop()
+    results.put({'workflow': name, 'requests': requests, 'bytes': transport.bytes_sent, 'wall_ms': wall * 1000,
+                 'peak_rss_kb': peak_rss, 'peak_traced_kb': peak_traced / 1024, 'objects': objects})
+
+
+def workflows(names: list, replay_options: dict, save: str = None, baseline: str = None, tolerance: float = 0.25):
+    """
+    End-to-end workflows against ReplayTransport, each in its own process so peak RSS is its own
+
+    Reports upstream requests, bytes served, wall time, peak RSS, peak traced Python memory, and objects: the
+    growth in allocated memory blocks (roughly, Python objects) over the traced pass.
+
+    :param names: workflows to run, all if empty
+    :param replay_options: passed to ReplayTransport
+    :param save: write the results to this JSON file
+    :param baseline: JSON file from an earlier --save to compare against
+    :param tolerance: allowed relative growth of wall time, peak traced memory and objects over the baseline
+    :return: number of regressions against the baseline
+    """
+    context = multiprocessing.get_context('spawn')
+    rows = []
+    for name in (names if names else WORKFLOWS):
+        queue = context.Queue()
+        process = context.Process(target=_run_workflow, args=(name, replay_options, queue))
+        process.start()
+        rows.append(queue.get())
+        process.join()
+    print(f"{'workflow':<24}{'requests':>9}{'KB served':>11}{'wall':>12}{'peak RSS':>12}{'traced':>12}{'objects':>10}")
+    for row in rows:
+        print(f"{row['workflow']:<24}{row['requests']:>9}{row['bytes'] / 1024:>11.0f}{row['wall_ms']:>9.1f} ms"
+              f"{row['peak_rss_kb'] / 1024:>9.1f} MB{row['peak_traced_kb'] / 1024:>9.1f} MB{row['objects']:>10}")
+    if save:
+        with open(save, 'w') as file:
+            json.dump(rows, file, indent=2)
+    regressions = 0
+    if baseline:
+        with open(baseline) as file:
+            previous = {row['workflow']: row for row in json.load(file)}
+        for row in rows:
+            before = previous.get(row['workflow'])
+            if not before:
+                continue
+            # request counts are deterministic, anything more is a regression
+            checks = [('requests', 0), ('wall_ms', tolerance), ('peak_traced_kb', tolerance),
+                      ('objects', tolerance)]
+            for metric, allowed in checks:
+                if row[metric] > before[metric] * (1 + allowed) and row[metric] - before[metric] > 1:
+                    regressions += 1
+                    print(f"REGRESSION {row['workflow']}: {metric} {before[metric]:.1f} -> {row[metric]:.1f}")
+    return regressions
+
+
+def _footprint(model: str, count: int, **client_options):
+    """
+    Bytes retained per model object once the decoded response itself has been released
+
+    :param model: key of MODELS
+    :param count: objects to build
+    :param client_options: passed to InternationalShowtimes
+    :return: bytes per object
+    """
+    make_payload, build = MODELS[model]
+    body = json.dumps([make_payload(i) for i in range(count)])
+    parent = isa.InternationalShowtimes(api_key='benchmark', lazy=True, **client_options)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    payloads = json.loads(body)
+    objects = [build(payload, parent) for payload in payloads]
+    del payloads
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del objects
+    return retained / count
+
+
+def memory(count: int):
+    print(f"{'model':<10}{'keep_raw':>14}{'drop raw':>14}")
+    for model in MODELS:
+        kept = _footprint(model, count)
+        dropped = _footprint(model, count, keep_raw=False)
+        print(f"{model:<10}{kept:>12.0f} B{dropped:>12.0f} B")
+
+
+def _time(function, repeat: int):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def decode(repeat: int):
+    """
+    Best-of-repeat time to decode one typical response body per endpoint, with each available JSON backend
+    """
+    backends = {'json': json.loads}
+    if isa.orjson:
+        backends['orjson'] = isa.orjson.loads
+    print(f"{'endpoint':<12}{'size':>10}" + ''.join(f"{name:>12}" for name in backends))
+    for endpoint, (make_payload, count) in ENDPOINTS.items():
+        body = json.dumps({endpoint: [make_payload(i) for i in range(count)]}).encode()
+        timings = [_time(lambda: loads(body), repeat) * 1000 for loads in backends.values()]
+        print(f"{endpoint:<12}{len(body) / 1024:>7.0f} KB" + ''.join(f"{timing:>9.2f} ms" for timing in timings))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks for international_showtimes_api")
+    parser.add_argument('benchmark', choices=['memory', 'decode', 'workflows', 'record'])
+    parser.add_argument('--count', type=int, default=20000, help="objects per model (memory)")
+    parser.add_argument('--repeat', type=int, default=20, help="timing repetitions (decode)")
+    parser.add_argument('--workflow', action='append', choices=list(WORKFLOWS), help="workflow to run, repeatable "
+                                                                                     "(workflows; default all)")
+    parser.add_argument('--fixtures', help="directory of recorded responses (workflows, record)")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds per replayed request (workflows)")
+    parser.add_argument('--scale', type=float, default=1.0, help="payload scale factor (workflows)")
+    parser.add_argument('--save', help="write results to this JSON file (workflows)")
+    parser.add_argument('--baseline', help="fail on regressions against this JSON file (workflows)")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative growth (workflows)")
+    parser.add_argument('--api-key', help="live API key (record)")
+    parser.add_argument('--countries', help="e.g. US, limits what is recorded (record)")
+    args = parser.parse_args()
+    if args.benchmark == 'memory':
+        memory(args.count)
+    elif args.benchmark == 'decode':
+        decode(args.repeat)
+    elif args.benchmark == 'workflows':
+        options = {'fixtures': args.fixtures, 'latency': args.latency, 'scale': args.scale}
+        if workflows(args.workflow, options, save=args.save, baseline=args.baseline, tolerance=args.tolerance):
+            sys.exit(1)
+    elif args.benchmark == 'record':
+        if not args.api_key or not args.fixtures:
+            parser.error("record needs --api-key and --fixtures")
+        record(args.api_key, args.fixtures, countries=args.countries)
@@ -3,11 +3,57 @@
 import requests
 import logging
 import json
-from urllib.parse import urlencode, quote
-from datetime import datetime, timedelta
+import array
+import asyncio
+import bisect
+import codecs
+import contextvars
+import heapq
+import math
+import mmap
+import random
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+from datetime import datetime, timedelta, timezone
 
-logging.basicConfig(level=logging.INFO,
-                    format="%(asctime)s - %(levelname)s - %(message)s")
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+_IDS_PER_REQUEST = 50  # keeps batched ?ids= queries well under URL length limits
+_NEARBY_RADIUS_KM = 50  # search radius for nearest-cinema queries without an explicit radius_km
+_NEARBY_PADDING = 2  # location queries load this multiple of their radius, so queries close by are answered locally
+_STREAM_CHUNK_SIZE = 64 * 1024
+_PER_PAGE = 100
+_MAX_PAGES = 1000  # pages walked without a total count before giving up, in case the API ignores page
+_FULL_SYNC_INTERVAL = 60 * 60  # seconds between full snapshots in sync_showtimes, which catch cancelled showtimes
+
+
+def _meta_int(meta: dict, *names):
+    for name in names:
+        try:
+            return int(meta[name])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
 
 
 def _convert_to_datetime(date):
@@ -18,45 +64,658 @@ def _get_midnight(date):
     return datetime.combine(date, datetime.min.time()).timestamp()
 
 
-def _get_request(url, headers=None, payload: dict = None, stream: bool = False):
-    logging.info(f"GET {url}")
+def _parse_timestamp(value):
+    """
+    Epoch seconds for an ISO 8601 string such as '2020-03-05T19:30:00-05:00', a datetime or a number
+
+    :return: float, or None if value is missing or unparseable
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def _json_loads(content):
+    """
+    Decode a JSON body, with orjson when it is installed
+    """
+    if orjson:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+_ENDPOINTS = ('movies', 'cinemas', 'showtimes', 'chains', 'genres')
+
+
+def _endpoint_name(url):
+    segments = urlsplit(url).path.rstrip('/').split('/')
+    for segment in reversed(segments):
+        if segment in _ENDPOINTS:
+            return segment
+    return segments[-1]
+
+
+class DecodeStats:
+    """
+    Per-endpoint counters for response decoding: bodies decoded, bytes and time spent
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}  # endpoint -> [count, seconds, bytes]
+
+    def record(self, endpoint: str, seconds: float, size: int):
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, [0, 0.0, 0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] += size
+
+    def snapshot(self):
+        """
+
+        :return: {endpoint: {'count': ..., 'seconds': ..., 'bytes': ..., 'mean_ms': ...}, ...}
+        """
+        with self._lock:
+            return {endpoint: {'count': count, 'seconds': seconds, 'bytes': size,
+                               'mean_ms': seconds * 1000 / count}
+                    for endpoint, (count, seconds, size) in self._stats.items()}
+
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # seconds
+
+
+def _prometheus_labels(labels: dict):
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels.items()) + '}'
+
+
+class Metrics:
+    """
+    Per-endpoint upstream request counters, latency histograms, bytes transferred and retries
+
+    Filled in by InstrumentedTransport, which InternationalShowtimes only puts in place when it is given a
+    Metrics, so a client without one pays nothing. Callbacks added with add_callback() see every request.
+    """
+
+    def __init__(self, buckets: tuple = _LATENCY_BUCKETS):
+        """
+
+        :param buckets: upper bounds of the latency histogram buckets, in seconds
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._endpoints = {}  # endpoint -> {'requests': ..., ..., 'histogram': [count per bucket, +Inf last]}
+        self._callbacks = []
+
+    def add_callback(self, callback):
+        """
+
+        :param callback: callable(event) called after every request, with event a dict of endpoint, url, status
+        (None if the request raised), seconds and bytes
+        """
+        self._callbacks.append(callback)
+
+    def _endpoint(self, endpoint: str):
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = {'requests': 0, 'errors': 0, 'not_modified': 0, 'retries': 0, 'bytes': 0, 'seconds': 0.0,
+                     'histogram': [0] * (len(self.buckets) + 1)}
+            self._endpoints[endpoint] = stats
+        return stats
+
+    def record_request(self, url, status, seconds: float, size: int):
+        endpoint = _endpoint_name(url)
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats['requests'] += 1
+            if status is None or status >= 400:
+                stats['errors'] += 1
+            elif status == 304:
+                stats['not_modified'] += 1
+            stats['bytes'] += size
+            stats['seconds'] += seconds
+            stats['histogram'][bisect.bisect_left(self.buckets, seconds)] += 1
+        if self._callbacks:
+            event = {'endpoint': endpoint, 'url': url, 'status': status, 'seconds': seconds, 'bytes': size}
+            for callback in self._callbacks:
+                callback(event)
+
+    def record_retry(self, url):
+        with self._lock:
+            self._endpoint(_endpoint_name(url))['retries'] += 1
+
+    def snapshot(self):
+        """
+
+        :return: {endpoint: {'requests': ..., 'errors': ..., 'not_modified': ..., 'retries': ..., 'bytes': ...,
+        'seconds': ..., 'histogram': {upper bound: count, ...}}, ...}
+        """
+        with self._lock:
+            return {endpoint: {**{name: value for name, value in stats.items() if name != 'histogram'},
+                               'histogram': dict(zip(self.buckets + (float('inf'),), stats['histogram']))}
+                    for endpoint, stats in self._endpoints.items()}
+
+    def prometheus_text(self, cache_stats: dict = None, prefix: str = 'isa'):
+        """
+        Render the metrics, plus per-entity cache counters if given, in the Prometheus text exposition format
+
+        :param cache_stats: Cache.stats()
+        :param prefix: metric name prefix
+        :return: str
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+            for suffix, labels, value in samples:
+                lines.append(f'{prefix}_{name}{suffix}{_prometheus_labels(labels)} {value}')
+
+        for name, key, help_text in (('requests_total', 'requests', 'Upstream requests'),
+                                     ('request_errors_total', 'errors', 'Upstream requests that failed'),
+                                     ('not_modified_total', 'not_modified', 'Upstream requests answered with 304'),
+                                     ('retries_total', 'retries', 'Upstream request retries'),
+                                     ('response_bytes_total', 'bytes', 'Response bytes received')):
+            family(name, 'counter', help_text,
+                   [('', {'endpoint': endpoint}, stats[key]) for endpoint, stats in snapshot.items()])
+        samples = []
+        for endpoint, stats in snapshot.items():
+            cumulative = 0
+            for bound, count in stats['histogram'].items():
+                cumulative += count
+                samples.append(('_bucket', {'endpoint': endpoint, 'le': ('+Inf' if bound == float('inf') else bound)},
+                                cumulative))
+            samples.append(('_sum', {'endpoint': endpoint}, stats['seconds']))
+            samples.append(('_count', {'endpoint': endpoint}, stats['requests']))
+        family('request_duration_seconds', 'histogram', 'Upstream request latency', samples)
+        if cache_stats:
+            for name, key, help_text in (('cache_hits_total', 'hits', 'Cache hits'),
+                                         ('cache_misses_total', 'misses', 'Cache misses'),
+                                         ('cache_stale_hits_total', 'stale_hits', 'Stale entries served'),
+                                         ('cache_evictions_total', 'evictions', 'Entries evicted to stay in size')):
+                family(name, 'counter', help_text,
+                       [('', {'entity': entity}, stats[key]) for entity, stats in cache_stats.items()])
+            family('cache_entries', 'gauge', 'Entries held in memory',
+                   [('', {'entity': entity}, stats['size']) for entity, stats in cache_stats.items()])
+        return '\n'.join(lines) + '\n'
+
+
+def _iter_json_array(chunks, key: str, captured: dict = None):
+    """
+    Incrementally parse a streamed JSON object, yielding the elements of its top-level array `key` one at a time
+
+    Only the element being parsed (plus any other top-level value being skipped) is held in memory.
+
+    :param chunks: iterable of bytes, e.g. Response.iter_content()
+    :param key: name of the top-level array, e.g. 'showtimes'
+    :param captured: dict whose keys name other top-level values to keep, e.g. {'meta_info': None}; they are
+    filled in as they are read, so once the generator is exhausted
+    :return: generator of decoded elements
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    state = {'buffer': '', 'pos': 0, 'eof': False}
+
+    def fill():
+        if state['eof']:
+            return False
+        chunk = next(chunks, None)
+        if chunk is None:
+            state['eof'] = True
+            text = utf8.decode(b'', final=True)
+        else:
+            text = utf8.decode(chunk)
+        state['buffer'] = state['buffer'][state['pos']:] + text
+        state['pos'] = 0
+        return True
+
+    def peek():
+        # next non-whitespace character, without consuming it
+        while True:
+            buffer, pos = state['buffer'], state['pos']
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                pos += 1
+            state['pos'] = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not fill():
+                raise ValueError(f"Unexpected end of JSON stream while reading '{key}'")
+
+    def expect(characters):
+        character = peek()
+        if character not in characters:
+            raise ValueError(f"Expected one of {characters!r} at offset {state['pos']}, got {character!r}")
+        state['pos'] += 1
+        return character
+
+    def value():
+        while True:
+            peek()
+            try:
+                decoded, end = decoder.raw_decode(state['buffer'], state['pos'])
+            except json.JSONDecodeError:
+                if not fill():
+                    raise
+                continue
+            # a number at the very end of the buffer may continue in the next chunk
+            if end == len(state['buffer']) and fill():
+                continue
+            state['pos'] = end
+            return decoded
+
+    expect('{')
+    if peek() == '}':
+        return
+    while True:
+        name = value()
+        expect(':')
+        if name == key:
+            expect('[')
+            if peek() == ']':
+                state['pos'] += 1
+            else:
+                while True:
+                    yield value()
+                    if expect(',]') == ']':
+                        break
+        elif captured is not None and name in captured:
+            captured[name] = value()
+        else:
+            value()
+        if expect(',}') == '}':
+            return
+
+
+def _get_retry_after(res):
+    """
+    Parse a Retry-After header, either delta-seconds or an HTTP date
+
+    :param res:
+    :return: seconds to wait, or None
+    """
+    value = res.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class HTTPTransport:
+    """
+    Pooled, keep-alive HTTP transport with per-request timeouts and retries
+
+    Any object with a compatible get() method returning a requests.Response-like object (truthy on success,
+    with .content) can be passed to InternationalShowtimes instead, e.g. a local stub in tests.
+    """
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, timeout=(3.05, 30), max_retries: int = 3, backoff_factor: float = 0.5,
+                 max_backoff: float = 30, pool_connections: int = 10, pool_maxsize: int = 10,
+                 session: requests.Session = None):
+        """
+
+        :param timeout: seconds, or a (connect, read) tuple
+        :param max_retries: retries after the first attempt on connection errors, 429 and 5xx
+        :param backoff_factor: base delay for exponential backoff, in seconds
+        :param max_backoff: upper bound for any single delay, including Retry-After
+        :param pool_connections: number of per-host connection pools to keep
+        :param pool_maxsize: connections kept alive per host
+        :param session: a preconfigured requests.Session to use instead of a new one
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.session = (session if session else requests.Session())
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+        self.on_retry = None  # callable(url, attempt, delay), called before each retry
+
+    def _backoff(self, attempt: int):
+        # "full jitter": spread retries from many clients across the whole backoff window
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    def get(self, url, headers=None, payload: dict = None, stream: bool = False):
+        attempt = 0
+        while True:
+            try:
+                res = self.session.get(url, data=payload, stream=stream, headers=headers, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if res.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                    return res
+                retry_after = _get_retry_after(res)
+                delay = (min(self.max_backoff, retry_after) if retry_after is not None else self._backoff(attempt))
+                res.close()
+            attempt += 1
+            if self.on_retry:
+                self.on_retry(url, attempt, delay)
+            logger.warning(f"Retrying GET {url} in {delay:.2f}s (attempt {attempt} of {self.max_retries})")
+            time.sleep(delay)
+
+    def close(self):
+        self.session.close()
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every request made through a client
+    """
+
+    def __init__(self, rate: float, burst: int = None):
+        """
+
+        :param rate: requests per second
+        :param burst: requests allowed back to back before throttling kicks in, defaults to one second's worth
+        """
+        self.rate = rate
+        self.burst = (burst if burst else max(1, int(math.ceil(rate))))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take a token, possibly from the future
+
+        :return: seconds the caller has to wait before using it
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return (0.0 if self._tokens >= 0 else -self._tokens / self.rate)
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class RateLimitedTransport:
+    """
+    Wraps another transport so that every request, retries included, goes through a RateLimiter
+    """
+
+    def __init__(self, transport, rate_limiter: RateLimiter):
+        self.transport = transport
+        self.rate_limiter = rate_limiter
+
+    def get(self, url, headers=None, payload: dict = None, stream: bool = False):
+        self.rate_limiter.acquire()
+        return self.transport.get(url, headers=headers, payload=payload, stream=stream)
+
+    def close(self):
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
+
+
+class InstrumentedTransport:
+    """
+    Wraps another transport and records every request, and every retry of an HTTPTransport, into a Metrics
+    """
+
+    def __init__(self, transport, metrics: Metrics):
+        self.transport = transport
+        self.metrics = metrics
+        if hasattr(transport, 'on_retry'):
+            transport.on_retry = (lambda url, attempt, delay: metrics.record_retry(url))
+
+    def get(self, url, headers=None, payload: dict = None, stream: bool = False):
+        started = time.perf_counter()
+        try:
+            res = self.transport.get(url, headers=headers, payload=payload, stream=stream)
+        except requests.exceptions.RequestException:
+            self.metrics.record_request(url, None, time.perf_counter() - started, 0)
+            raise
+        seconds = time.perf_counter() - started
+        if stream:  # the body hasn't been read yet
+            size = int(getattr(res, 'headers', {}).get('Content-Length') or 0)
+        else:
+            size = len(getattr(res, 'content', b'') or b'')
+        self.metrics.record_request(url, getattr(res, 'status_code', 200), seconds, size)
+        return res
+
+    def close(self):
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
+
+
+class CountingTransport:
+    """
+    Wraps another transport and counts the requests made inside a counting() block
+
+    The block is tracked per context, not per transport, so requests from other threads aren't counted, while
+    work the block hands to the client's page threads is (they run in a copy of the caller's context).
+    """
+
+    def __init__(self, transport):
+        self.transport = transport
+        self._tally = contextvars.ContextVar(f'request_tally_{id(self)}', default=None)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def counting(self):
+        """
+        with transport.counting() as tally: ...; tally[0] holds the requests made so far inside the block
+        """
+        tally = [0]
+        token = self._tally.set(tally)
+        try:
+            yield tally
+        finally:
+            self._tally.reset(token)
+
+    def get(self, url, headers=None, payload: dict = None, stream: bool = False):
+        tally = self._tally.get()
+        if tally is not None:
+            with self._lock:
+                tally[0] += 1
+        return self.transport.get(url, headers=headers, payload=payload, stream=stream)
+
+    def close(self):
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
+
+
+class ConditionalTransport:
+    """
+    Wraps another transport with an HTTP cache of validated responses
+
+    Bodies that came with an ETag or Last-Modified are kept per url. Later requests for the url send
+    If-None-Match/If-Modified-Since, and a 304 is answered with the kept body, so an unchanged list costs a
+    round trip but no download. Streamed requests are passed straight through.
+    """
+
+    def __init__(self, transport, maxsize: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        """
+
+        :param transport: transport making the actual requests
+        :param maxsize: responses kept before the least recently used one is dropped
+        :param max_bytes: upper bound for the kept bodies together
+        """
+        self.transport = transport
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # normalized url -> (validators, headers, content)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.revalidated = 0
+        self.downloaded = 0
+
+    def _store(self, key, validators: dict, headers: dict, content: bytes):
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key)[2])
+            if len(content) > self.max_bytes:
+                return
+            self._entries[key] = (validators, headers, content)
+            self._bytes += len(content)
+            while len(self._entries) > self.maxsize or self._bytes > self.max_bytes:
+                self._bytes -= len(self._entries.popitem(last=False)[1][2])
+
+    def get(self, url, headers=None, payload: dict = None, stream: bool = False):
+        if stream or payload:
+            return self.transport.get(url, headers=headers, payload=payload, stream=stream)
+        key = normalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            headers = {**(headers if headers else {}), **entry[0]}
+        res = self.transport.get(url, headers=headers, payload=payload, stream=stream)
+        if res is None:
+            return res
+        if getattr(res, 'status_code', None) == 304 and entry is not None:
+            self.revalidated += 1
+            return _stored_response(url, entry[1], entry[2])
+        if res:
+            self.downloaded += 1
+            response_headers = getattr(res, 'headers', {})
+            validators = {}
+            if response_headers.get('ETag'):
+                validators['If-None-Match'] = response_headers['ETag']
+            if response_headers.get('Last-Modified'):
+                validators['If-Modified-Since'] = response_headers['Last-Modified']
+            if validators:
+                self._store(key, validators, dict(response_headers), res.content)
+        return res
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'bytes': self._bytes, 'revalidated': self.revalidated,
+                    'downloaded': self.downloaded}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def close(self):
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
+
+
+def _stored_response(url, headers: dict, content: bytes):
+    res = requests.Response()
+    res.status_code = 200
+    res.url = url
+    res.headers.update(headers)
+    res._content = content
+    res._content_consumed = True
+    return res
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one; every caller gets the leader's result or exception
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future
+
+    def do(self, key, function):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(function())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+
+def normalize_url(url):
+    """
+    Canonical form of a url for request coalescing and caching: query parameters sorted, repeated parameters kept
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ''))
+
+
+_default_transport = None
+
+
+def _get_request(url, headers=None, payload: dict = None, stream: bool = False, transport=None):
+    global _default_transport
+    if not transport:
+        if not _default_transport:
+            _default_transport = HTTPTransport()
+        transport = _default_transport
+    logger.debug(f"GET {url}")
     try:
-        return requests.get(url, data=payload, stream=stream, headers=(headers if headers else None))
+        return transport.get(url, headers=(headers if headers else None), payload=payload, stream=stream)
     except requests.exceptions.RequestException:
-        logging.error('HTTP Request failed')
+        logger.error('HTTP Request failed')
         return None
 
 
+def _cinema_matches(cinema, name: str = None, city: str = None, zip_code: str = None, state: str = None,
+                    cinema_id: str = None):
+    """
+    Whether one raw cinema payload passes the filters; a field the payload lacks never excludes it, except a
+    missing zip code when the cinema has an address and a zip code is asked for
+    """
+    if name and cinema.get('name') and name != cinema['name']:
+        return False
+    if cinema_id and cinema.get('id') and cinema_id != cinema['id']:
+        return False
+    if not (city or zip_code or state):
+        return True
+    address = (cinema.get('location') or {}).get('address')
+    if not address:
+        return True
+    if city and address.get('city') and city != address['city']:
+        return False
+    if zip_code and str(zip_code) != address.get('zipcode'):
+        return False
+    if state:
+        field = ('state_abbr' if len(state) == 2 else 'state')
+        if address.get(field) and state != address[field]:
+            return False
+    return True
+
+
 def filter_cinemas(data, name: str = None, city: str = None, zip_code: str = None, state: str = None,
                    cinema_id: str = None):
-    results = []
-    for cinema in data:
-        valid = True
-        if name and cinema.get('name') and name != cinema.get('name'):
-            valid = False
-        if cinema_id and cinema.get('id') and cinema_id != cinema.get('id'):
-            valid = False
-        location_data = cinema.get('location')
-        if location_data:
-            location_address_data = location_data.get('address')
-            if location_address_data:
-                if city and location_address_data.get('city') and city != location_address_data.get('city'):
-                    valid = False
-                if zip_code:
-                    if not location_address_data.get('zipcode'):
-                        valid = False
-                    elif str(zip_code) != location_address_data.get('zipcode'):
-                        valid = False
-                if state:
-                    if len(state) == 2:
-                        if location_address_data.get('state_abbr') and state != location_address_data.get('state_abbr'):
-                            valid = False
-                    else:
-                        if location_address_data.get('state') and state != location_address_data.get('state'):
-                            valid = False
-        if valid:
-            results.append(cinema)
-    return results
+    return [cinema for cinema in data
+            if _cinema_matches(cinema, name=name, city=city, zip_code=zip_code, state=state, cinema_id=cinema_id)]
 
 
 def filter_movies(movies, title: str = None, movie_id: str = None):
@@ -69,10 +728,104 @@ def filter_movies(movies, title: str = None, movie_id: str = None):
     return results
 
 
+def _raw(data, parent):
+    """
+    The raw payload a model should keep, or None if the client was built with keep_raw=False
+    """
+    return (data if getattr(parent, 'keep_raw', True) else None)
+
+
+# named field projections per entity; None asks for the full payload
+FIELD_PRESETS = {
+    'movies': {
+        'minimal': ('id', 'title', 'runtime'),
+        'listing': ('id', 'slug', 'title', 'original_title', 'original_language', 'poster_image_thumbnail', 'runtime',
+                    'age_limits', 'genres', 'ratings', 'release_dates'),
+        'full': None,
+    },
+    'cinemas': {
+        'minimal': ('id', 'name', 'location'),
+        'listing': ('id', 'slug', 'name', 'chain_id', 'city_id', 'telephone', 'website', 'booking_type', 'location'),
+        'full': None,
+    },
+}
+
+# fields every projection keeps, because the cache and its indexes read them
+_REQUIRED_FIELDS = {'movies': ('id', 'title'), 'cinemas': ('id', 'location')}
+
+# fields that differ between languages; everything else, including all of cinemas and showtimes, is shared
+LOCALIZED_FIELDS = {
+    'movies': ('title', 'synopsis', 'poster_image', 'poster_image_thumbnail', 'trailers', 'genres'),
+    'genres': ('name',),
+}
+
+
+def _resolve_fields(entity: str, fields):
+    """
+
+    :param entity: 'movies' or 'cinemas'
+    :param fields: preset name from FIELD_PRESETS, iterable of API field names, or None
+    :return: tuple of API field names, or None for the full payload
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        presets = FIELD_PRESETS[entity]
+        if fields not in presets:
+            raise Exception(f"Unknown field preset {fields}, expected one of {', '.join(presets)}.")
+        fields = presets[fields]
+        if fields is None:
+            return None
+    return tuple(dict.fromkeys((*_REQUIRED_FIELDS[entity], *fields)))
+
+
+def _fields_param(fields):
+    return (f"&fields={','.join(fields)}" if fields else '')
+
+
+def _project(data, fields):
+    """
+    Tag a payload fetched with a projection, so a model built from it, even after a trip through the
+    persistent backend, knows which fields are missing
+    """
+    return ({**data, '_fields': list(fields)} if fields else data)
+
+
+def _covers(model, data):
+    """
+    Whether a cached model already holds every field of payload data
+    """
+    return model._fields is None or (data.get('_fields') is not None and model._fields.issuperset(data['_fields']))
+
+
+def _drop_unfetched(model):
+    # unset attributes whose field was left out, so reading one goes through __getattr__ and completes the model
+    for attribute, field in model.FIELDS.items():
+        if field not in model._fields:
+            try:
+                delattr(model, attribute)
+            except AttributeError:
+                pass
+
+
+def _is_unfetched(model, name):
+    return model._fields is not None and name in model.FIELDS and model.FIELDS[name] not in model._fields
+
+
 class Cinema:
+    # attribute -> top-level payload field it is read from, used by field projections
+    FIELDS = {'slug': 'slug', 'name': 'name', 'chainId': 'chain_id', 'cityId': 'city_id', 'phoneNumber': 'telephone',
+              'email': 'email', 'website': 'website', 'booking_type': 'booking_type',
+              **{attribute: 'location' for attribute in ('lat', 'lon', 'address', 'street', 'streetNumber', 'zipCode',
+                                                         'city', 'state', 'stateAbbr', 'country', 'countryCode')}}
+    __slots__ = ('parent', 'data', 'id', 'slug', 'name', 'chainId', 'cityId', 'phoneNumber', 'email', 'website', 'lat', 'lon',
+                 'address', 'street', 'streetNumber', 'zipCode', 'city', 'state', 'stateAbbr', 'country', 'countryCode',
+                 'booking_type', '_fields')
+
     def __init__(self, data, parent):
         self.parent = parent
-        self.data = data
+        self._fields = (frozenset(data['_fields']) if data.get('_fields') is not None else None)
+        self.data = _raw(data, parent)
         self.id = data.get('id')
         self.slug = data.get('slug')
         self.name = data.get('name')
@@ -95,70 +848,94 @@ class Cinema:
                 self.country = data['location']['address'].get('country')
                 self.countryCode = data['location']['address'].get('country_code')
         self.booking_type = data.get('booking_type')
+        if self._fields is not None:
+            _drop_unfetched(self)
+
+    def __getattr__(self, name):
+        # only reached for attributes not set, e.g. fields left out by a projection
+        if name.startswith('_') or not _is_unfetched(self, name):
+            raise AttributeError(name)
+        return self.parent._complete(self, name)
 
 
 class Genre:
+    FIELDS = {'name': 'name'}
+    __slots__ = ('parent', 'data', 'id', 'name')
+
     def __init__(self, data, parent):
         self.parent = parent
-        self.data = data
+        self.data = _raw(data, parent)
         self.id = data.get('id')
         self.name = data.get('name')
 
 
 class Trailer:
+    __slots__ = ('parent', 'data', 'language', 'official', 'files')
+
     def __init__(self, data, parent):
         self.parent = parent
-        self.data = data
+        self.data = _raw(data, parent)
         self.language = data.get('language')
         self.official = data.get('is_official')
         self.files = data.get('trailer_files')
 
 
 class Rating:
+    __slots__ = ('parent', 'data', 'value', 'votes')
+
     def __init__(self, data, parent):
         self.parent = parent
-        self.data = data
+        self.data = _raw(data, parent)
         if data:
             self.value = data.get('value')
             self.votes = data.get('vote_count')
 
 
 class Ratings:
+    __slots__ = ('parent', 'data', 'IMDbRating', 'TMDbRating', 'RottenTomatoesRating')
+
     def __init__(self, data, parent):
         self.parent = parent
-        self.data = data
+        self.data = _raw(data, parent)
         self.IMDbRating = Rating(data.get('imdb'), self.parent)
         self.TMDbRating = Rating(data.get('tmdb'), self.parent)
         self.RottenTomatoesRating = Rating(data.get('rotten_tomatos'), self.parent)
 
 
 class ReleaseDate:
+    __slots__ = ('parent', 'data', 'locale', 'region', 'date')
+
     def __init__(self, data, parent):
         self.parent = parent
-        self.data = data
+        self.data = _raw(data, parent)
         self.locale = data.get('locale')
         self.region = data.get('region')
-        self.data = data.get('date')
+        self.date = data.get('date')
 
 
 class ReleaseDates:
+    __slots__ = ('parent', 'data')
+
     def __init__(self, data, parent):
         self.parent = parent
-        self.data = data
-        for k, v in self.data:
-            self.data[k] = [ReleaseDate(release_data, self.parent) for release_data in v]
+        # built into a new dict so the raw payload stays JSON-serializable for cache backends
+        self.data = {k: [ReleaseDate(release_data, self.parent) for release_data in v] for k, v in data.items()}
 
 
 class Image:
+    __slots__ = ('parent', 'data')
+
     def __init__(self, data, parent):
         self.parent = parent
         self.data = data
 
 
 class Person:
+    __slots__ = ('parent', 'data', 'id', 'name', 'image', 'job', 'character')
+
     def __init__(self, data, parent):
         self.parent = parent
-        self.data = data
+        self.data = _raw(data, parent)
         self.id = data.get('id')
         self.name = data.get('name')
         self.image = data.get('image')
@@ -167,18 +944,48 @@ class Person:
 
 
 class Country:
+    __slots__ = ('parent', 'data', 'ISOCode', 'name', 'APIAccess')
+
     def __init__(self, data, parent):
         self.parent = parent
-        self.data = data
+        self.data = _raw(data, parent)
         self.ISOCode = data.get('iso_code')
         self.name = data.get('name')
         self.APIAccess = data.get('is_access_granted')
 
 
 class Movie:
-    def __init__(self, data, parent):
+    # nested objects: attribute -> (payload field, builder)
+    NESTED = {
+        'genres': ('genres', lambda data, parent: [Genre(genre_data, parent) for genre_data in data]),
+        'trailers': ('trailers', lambda data, parent: [Trailer(trailer_data, parent) for trailer_data in data]),
+        'ratings': ('ratings', lambda data, parent: Ratings(data, parent)),
+        'releaseDates': ('release_dates', lambda data, parent: ReleaseDates(data, parent)),
+        'cast': ('cast', lambda data, parent: [Person(person_data, parent) for person_data in data]),
+        'crew': ('crew', lambda data, parent: [Person(person_data, parent) for person_data in data]),
+    }
+    # attribute -> payload field it is read from, used by field projections
+    FIELDS = {'slug': 'slug', 'title': 'title', 'originalTitle': 'original_title',
+              'originalLanguage': 'original_language', 'summary': 'synopsis', 'poster': 'poster_image',
+              'posterThumbnail': 'poster_image_thumbnail', 'scenesImages': 'scene_images', 'runtime': 'runtime',
+              'ageRestrictions': 'age_limits', 'website': 'website', 'productionCompanies': 'production_companies',
+              'keywords': 'keywords', 'IMDbId': 'imdb_id', 'TMDbId': 'tmdb_id', 'rentrakId': 'rentrak_film_id',
+              **{name: field for name, (field, _) in NESTED.items()}}
+    __slots__ = ('parent', 'data', 'id', 'slug', 'title', 'originalTitle', 'originalLanguage', 'summary', 'poster',
+                 'posterThumbnail', 'scenesImages', 'runtime', 'ageRestrictions', 'website', 'productionCompanies',
+                 'keywords', 'IMDbId', 'TMDbId', 'rentrakId', '_pending', '_fields') + tuple(NESTED)
+
+    def __init__(self, data, parent, lazy: bool = None):
+        """
+
+        :param data:
+        :param parent:
+        :param lazy: build genres, trailers, ratings, releaseDates, cast and crew on first access;
+        defaults to parent.lazy
+        """
         self.parent = parent
-        self.data = data
+        self._fields = (frozenset(data['_fields']) if data.get('_fields') is not None else None)
+        self.data = _raw(data, parent)
         self.id = data.get('id')
         self.slug = data.get('slug')
         self.title = data.get('title')
@@ -189,38 +996,84 @@ class Movie:
         self.posterThumbnail = data.get('poster_image_thumbnail')
         self.scenesImages = data.get('scene_images')
         self.runtime = data.get('runtime')
-        if data.get('genres'):
-            self.genres = [Genre(genre_data, self.parent) for genre_data in data.get('genres')]
-        if data.get('trailers'):
-            self.trailers = [Trailer(trailer_data, self.parent) for trailer_data in data.get('trailers')]
-        if data.get('ratings'):
-            self.ratings = Ratings(data.get('ratings'), self.parent)
         self.ageRestrictions = data.get('age_limits')
-        if data.get('release_dates'):
-            self.releaseDates = ReleaseDates(data.get('release_dates'), self.parent)
         self.website = data.get('website')
         self.productionCompanies = data.get('production_companies')
         self.keywords = data.get('keywords')
         self.IMDbId = data.get('imdb_id')
         self.TMDbId = data.get('tmdb_id')
         self.rentrakId = data.get('rentrak_film_id')
-        if data.get('cast'):
-            self.cast = [Person(person_data, self.parent) for person_data in data.get('cast')]
-        if data.get('crew'):
-            self.crew = [Person(person_data, self.parent) for person_data in data.get('crew')]
+        # raw payloads of nested objects not built yet; all that is kept of data once it is dropped
+        self._pending = {field: data[field] for field, _ in self.NESTED.values() if data.get(field)}
+        if self._fields is not None:
+            _drop_unfetched(self)
+        if not (lazy if lazy is not None else getattr(parent, 'lazy', False)):
+            for name, (field, _) in self.NESTED.items():
+                if field in self._pending:
+                    getattr(self, name)
+            self._pending = None
+
+    def __getattr__(self, name):
+        # only reached for attributes not set yet, i.e. nested objects that have not been built
+        # or fields left out by a projection
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if _is_unfetched(self, name):
+            return self.parent._complete(self, name)
+        if name not in Movie.NESTED:
+            raise AttributeError(name)
+        field, build = Movie.NESTED[name]
+        raw = (self._pending.get(field) if self._pending else None)
+        if not raw:
+            raise AttributeError(name)
+        value = build(raw, self.parent)
+        setattr(self, name, value)
+        self._pending.pop(field, None)
+        return value
+
+
+class Localized:
+    """
+    A Movie or Genre in another language: its LOCALIZED_FIELDS come from that language's payload, every
+    other attribute is read from the shared model
+    """
+    __slots__ = ('model', 'language', '_payload', '_built')
+
+    def __init__(self, model, language: str, payload: dict):
+        self.model = model
+        self.language = language
+        self._payload = payload
+        self._built = {}
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        field = type(self.model).FIELDS.get(name)
+        if field not in self._payload:
+            return getattr(self.model, name)
+        if name not in self._built:
+            value = self._payload[field]
+            nested = getattr(type(self.model), 'NESTED', {}).get(name)
+            self._built[name] = (nested[1](value, self.model.parent) if nested and value else value)
+        return self._built[name]
 
 
 class Showtime:
+    __slots__ = ('parent', 'data', 'id', 'cinemaId', 'cinema', 'movieId', 'movie', 'startTime', 'startTimestamp',
+                 'auditorium', 'is3D', 'isIMAX', 'language', 'subtitleLanguage', 'cinemaMovieTitle', 'bookingType',
+                 'bookingLink')
+
     def __init__(self, data, parent, movie: Movie = None, cinema: Cinema = None,
                  skip_additional_api_calls: bool = False):
         self.parent = parent
-        self.data = data
+        self.data = _raw(data, parent)
         self.id = data.get('id')
         self.cinemaId = data.get('cinema_id')
         self.cinema = cinema
         self.movieId = data.get('movie_id')
         self.movie = movie
         self.startTime = data.get('start_at')
+        self.startTimestamp = _parse_timestamp(self.startTime)
         self.auditorium = data.get('auditorium')
         self.is3D = data.get('is_3d')
         self.isIMAX = data.get('is_imax')
@@ -241,194 +1094,1769 @@ class Showtime:
 
 
 class Chain:
+    __slots__ = ('parent', 'data', 'id', 'name', 'websites', 'countries')
+
     def __init__(self, data, parent):
         self.parent = parent
-        self.data = data
+        self.data = _raw(data, parent)
         self.id = data.get('id')
         self.name = data.get('name')
         self.websites = data.get('websites')
         self.countries = data.get('countries')
 
 
-class Cache:
-    def __init__(self, parent):
-        self.movies = {}
-        self.cinemas = {}
-        self.showtimes = {}
-        self.chains = {}
-        self.genres = {}
+CachePolicy = namedtuple('CachePolicy', ['maxsize', 'ttl', 'stale_ttl', 'max_bytes'], defaults=[None])
+CachePolicy.__doc__ = """
+Size cap and expiry for one entity type in the Cache
 
-    def check_for_cached_movie(self, movie_id: str = None, title: str = None):
-        if not movie_id and not title:
-            raise Exception("Please provide either a movie_id or a title.")
-        if movie_id and movie_id in self.movies.keys():
-            return self.movies[movie_id]
-        else:
-            for _, movie in self.movies.items():
-                if movie.title == title:
-                    return movie
-        return None
+maxsize: entries kept before the least recently used one is evicted
+ttl: seconds an entry is fresh
+stale_ttl: seconds past ttl an entry may still be served while it is refreshed in the background
+max_bytes: upper bound for the entries' sizes together, in stores given a sizeof; None for no bound
+"""
 
-    def check_for_cached_cinema(self, cinema_id: str = None, latitude: str = None, longitude: str = None):
-        if cinema_id in self.cinemas.keys():
-            return self.cinemas[cinema_id]
-        if latitude and longitude:
-            for _, cinema in self.cinemas.items():
-                if cinema.lat == latitude and cinema.lon == longitude:
-                    return cinema
-        return None
+DEFAULT_CACHE_POLICIES = {
+    'movies': CachePolicy(maxsize=5000, ttl=6 * 60 * 60, stale_ttl=60 * 60),
+    'cinemas': CachePolicy(maxsize=20000, ttl=24 * 60 * 60, stale_ttl=6 * 60 * 60),
+    'showtimes': CachePolicy(maxsize=100000, ttl=10 * 60, stale_ttl=0),
+    'chains': CachePolicy(maxsize=2000, ttl=7 * 24 * 60 * 60, stale_ttl=24 * 60 * 60),
+    'genres': CachePolicy(maxsize=500, ttl=7 * 24 * 60 * 60, stale_ttl=24 * 60 * 60),
+    'missing': CachePolicy(maxsize=10000, ttl=5 * 60, stale_ttl=0),
+    'queries': CachePolicy(maxsize=1000, ttl=10 * 60, stale_ttl=0),
+    'localized': CachePolicy(maxsize=50000, ttl=6 * 60 * 60, stale_ttl=0),
+}
 
-    def check_for_cached_showtime(self, showtime_id: str = None):
-        if showtime_id and showtime_id in self.showtimes.keys():
-            return self.showtimes[showtime_id]
-        return None
+_MISSING = object()
+_REFRESH_BATCH_DELAY = 0.05  # seconds a refresh worker waits for more stale keys before its first request
 
-    def check_for_cached_chain(self, chain_id: str = None, chain_name: str = None):
-        if chain_id and chain_id in self.chains.keys():
-            return self.chains[chain_id]
-        if chain_name:
-            for _, chain in self.chains.items():
-                if chain.name == chain_name:
-                    return chain
+
+def _normalize_name(name):
+    if name is None:
         return None
+    return ' '.join(str(name).split()).casefold()
 
-    def check_for_cached_genre(self, genre_id: str = None, genre_name: str = None):
-        if genre_id and genre_id in self.genres.keys():
-            return self.genres[genre_id]
-        if genre_name:
-            for _, genre in self.genres.items():
-                if genre.name == genre_name:
-                    return genre
+
+def _coordinate_key(latitude, longitude):
+    if latitude is None or longitude is None:
+        return None
+    try:
+        return round(float(latitude), 5), round(float(longitude), 5)
+    except (TypeError, ValueError):
         return None
 
 
-class InternationalShowtimes:
-    def __init__(self, api_key: str, language: str = None):
-        self.key = api_key
-        self.baseUrl = 'https://api.internationalshowtimes.com/v4'
-        self.headers = {'x-api-key': self.key}
-        self.language = (language if language else "en")
-        self.cache = Cache(self)
-        self.get_all_current_movies()
+class HashIndex:
+    """
+    Secondary index from a derived value (e.g. a normalized title) to the keys of a CacheStore
+    """
 
-    def get_genre(self, genre_id: str = None, genre_name: str = None):
+    def __init__(self, key_func):
         """
 
-        :param genre_id:
-        :param genre_name:
-        :return: [Genre, ...]
+        :param key_func: callable(value) returning the index key, or None to leave the value unindexed
         """
-        cached_genre = self.cache.check_for_cached_genre(genre_id=genre_id, genre_name=genre_name)
-        if cached_genre:
-            return [cached_genre]
-        results = []
-        query = f'{self.baseUrl}/genres?lang={self.language}'
-        res = _get_request(url=query,
-                           headers=self.headers)
-        if res and res.json().get('genres'):
-            for genre_data in res.json()['genres']:
-                cached_genre = self.cache.check_for_cached_genre(genre_id=genre_id, genre_name=genre_name)
-                if cached_genre:
-                    results.append(cached_genre)
-                else:
-                    new_genre = Genre(genre_data, self)
-                    self.cache.genres[genre_data['id']] = new_genre
-                    results.append(new_genre)
-        if genre_id or genre_name:
-            filtered = []
-            for genre in results:
-                if (genre_id and genre_id == genre.id) or (genre_name and genre_name == genre.name):
-                    filtered.append(genre)
-            results = filtered
-        return results
+        self.key_func = key_func
+        self._buckets = {}  # index key -> {store key: None}, a dict used as an insertion-ordered set
 
-    def get_all_current_movies(self, cinema_id: str = None):
-        """
+    def add(self, key, value):
+        index_key = self.key_func(value)
+        if index_key is not None:
+            self._buckets.setdefault(index_key, {})[key] = None
 
-        :param cinema_id:
-        :return: [Movie, ...]
-        """
-        results = []
-        query = f'{self.baseUrl}/movies?lang={self.language}'
-        if cinema_id:
-            query = f'{query}&cinema_id={cinema_id}'
-        res = _get_request(url=query,
-                           headers=self.headers)
-        if res and res.json().get('movies'):
-            self.cache.movies.clear()  # clears the movie cache every time it is run
-            for movie_data in res.json()['movies']:
-                new_movie = Movie(movie_data, self)
-                self.cache.movies[movie_data['id']] = new_movie
-                results.append(new_movie)
-        return results
+    def remove(self, key, value):
+        index_key = self.key_func(value)
+        bucket = self._buckets.get(index_key)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._buckets[index_key]
 
-    def get_upcoming_movies(self):
-        """
+    def clear(self):
+        self._buckets.clear()
 
-        :return: [Movie, ...]
-        """
-        results = []
-        tomorrow = _get_midnight(datetime.today() + timedelta(days=1))
-        query = f'{self.baseUrl}/movies?lang={self.language}&include_upcoming=true&release_date_from={tomorrow}'
-        res = _get_request(url=query,
-                           headers=self.headers)
-        if res and res.json().get('movies'):
-            for movie_data in res.json()['movies']:
-                cached_movie = self.cache.check_for_cached_movie(movie_id=movie_data['id'])
-                if cached_movie:
-                    results.append(cached_movie)
-                else:
-                    new_movie = Movie(movie_data, self)
-                    self.cache.movies[movie_data['id']] = new_movie
-                    results.append(new_movie)
+    def get(self, index_key):
+        return list(self._buckets.get(index_key, ()))
+
+
+_EARTH_RADIUS_KM = 6371.0088
+_KM_PER_DEGREE = 111.32
+
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * _EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoGridIndex:
+    """
+    Spatial index bucketing points into a fixed lat/lon grid, for nearest-k and radius queries
+
+    Same add/remove interface as HashIndex, so it can be registered on a CacheStore.
+    """
+
+    def __init__(self, point_func, cell_degrees: float = 0.25):
+        """
+
+        :param point_func: callable(value) returning (lat, lon) as floats, or None to leave the value unindexed
+        :param cell_degrees: grid cell size; 0.25 degrees is roughly 28 km north-south
+        """
+        self.point_func = point_func
+        self.cell_degrees = cell_degrees
+        self._columns = max(1, round(360 / cell_degrees))  # columns wrap around at the antimeridian
+        self._cells = {}  # (row, col) -> {key: (lat, lon)}
+        self._points = {}  # key -> (row, col)
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees) % self._columns
+
+    def add(self, key, value):
+        point = self.point_func(value)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        self._cells.setdefault(cell, {})[key] = point
+        self._points[key] = cell
+
+    def remove(self, key, value):
+        cell = self._points.pop(key, None)
+        if cell is None:
+            return
+        bucket = self._cells[cell]
+        bucket.pop(key, None)
+        if not bucket:
+            del self._cells[cell]
+
+    def clear(self):
+        self._cells.clear()
+        self._points.clear()
+
+    def __len__(self):
+        return len(self._points)
+
+    def _ring(self, center, radius):
+        row, col = center
+        if radius == 0:
+            return [center]
+        cells = set()
+        for c in range(col - radius, col + radius + 1):
+            cells.add((row - radius, c % self._columns))
+            cells.add((row + radius, c % self._columns))
+        for r in range(row - radius + 1, row + radius):
+            cells.add((r, (col - radius) % self._columns))
+            cells.add((r, (col + radius) % self._columns))
+        return cells
+
+    def within(self, lat: float, lon: float, radius_km: float):
+        """
+
+        :param lat:
+        :param lon:
+        :param radius_km:
+        :return: [(distance_km, key), ...] sorted by distance
+        """
+        lat_span = radius_km / _KM_PER_DEGREE
+        lon_span = radius_km / (_KM_PER_DEGREE * max(math.cos(math.radians(min(abs(lat) + lat_span, 89.9))), 1e-6))
+        min_row = math.floor((lat - lat_span) / self.cell_degrees)
+        max_row = math.floor((lat + lat_span) / self.cell_degrees)
+        min_col = math.floor((lon - lon_span) / self.cell_degrees)
+        width = min(math.floor((lon + lon_span) / self.cell_degrees) - min_col, self._columns - 1)
+        results = []
+        if (max_row - min_row + 1) * (width + 1) > len(self._cells):
+            cells = [cell for cell in self._cells
+                     if min_row <= cell[0] <= max_row and (cell[1] - min_col) % self._columns <= width]
+        else:
+            cells = [(r, (min_col + c) % self._columns) for r in range(min_row, max_row + 1) for c in range(width + 1)]
+        for cell in cells:
+            for key, (point_lat, point_lon) in self._cells.get(cell, {}).items():
+                distance = _haversine_km(lat, lon, point_lat, point_lon)
+                if distance <= radius_km:
+                    results.append((distance, key))
+        results.sort()
+        return results
+
+    def nearest(self, lat: float, lon: float, count: int = 1, max_km: float = None):
+        """
+        Expanding ring search, stopping once no unvisited cell can hold anything closer
+
+        :param lat:
+        :param lon:
+        :param count:
+        :param max_km: ignore points further away than this
+        :return: [(distance_km, key), ...] sorted by distance
+        """
+        center = self._cell(lat, lon)
+        # the narrowest side of a cell bounds how far away the next ring of cells can be
+        cell_km = self.cell_degrees * _KM_PER_DEGREE * max(math.cos(math.radians(min(abs(lat), 89.9))), 1e-6)
+        best = []  # max-heap of (-distance, key)
+        visited = set()  # rings overlap once they wrap around the antimeridian
+        seen = 0
+        radius = 0
+        while seen < len(self._points):
+            ring_km = max(0, radius - 1) * cell_km
+            if max_km is not None and ring_km > max_km:
+                break
+            if len(best) >= count and -best[0][0] <= ring_km:
+                break
+            for cell in self._ring(center, radius):
+                if cell in visited:
+                    continue
+                visited.add(cell)
+                for key, (point_lat, point_lon) in self._cells.get(cell, {}).items():
+                    seen += 1
+                    distance = _haversine_km(lat, lon, point_lat, point_lon)
+                    if max_km is not None and distance > max_km:
+                        continue
+                    if len(best) < count:
+                        heapq.heappush(best, (-distance, key))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, key))
+            radius += 1
+        return sorted((-negative_distance, key) for negative_distance, key in best)
+
+
+class TimeIndex:
+    """
+    Per-group index of keys sorted by start time, for windowed and "next N" queries
+
+    Same add/remove interface as HashIndex, so it can be registered on a CacheStore.
+    """
+
+    def __init__(self, group_func, time_func):
+        """
+
+        :param group_func: callable(value) returning the group (e.g. a cinema id), or None to leave the value unindexed
+        :param time_func: callable(value) returning epoch seconds, or None to leave the value unindexed
+        """
+        self.group_func = group_func
+        self.time_func = time_func
+        self._groups = {}  # group -> [(timestamp, key), ...] kept sorted
+
+    def add(self, key, value):
+        group, timestamp = self.group_func(value), self.time_func(value)
+        if group is not None and timestamp is not None:
+            bisect.insort(self._groups.setdefault(group, []), (timestamp, key))
+
+    def remove(self, key, value):
+        group, timestamp = self.group_func(value), self.time_func(value)
+        entries = self._groups.get(group)
+        if not entries or timestamp is None:
+            return
+        position = bisect.bisect_left(entries, (timestamp, key))
+        if position < len(entries) and entries[position] == (timestamp, key):
+            del entries[position]
+            if not entries:
+                del self._groups[group]
+
+    def clear(self):
+        self._groups.clear()
+
+    def between(self, group, start: float, end: float):
+        """
+
+        :param group:
+        :param start: epoch seconds, inclusive
+        :param end: epoch seconds, exclusive
+        :return: [(timestamp, key), ...] earliest first
+        """
+        entries = self._groups.get(group, [])
+        # (start,) sorts before every (start, key) and (end,) before every (end, key)
+        return entries[bisect.bisect_left(entries, (start,)):bisect.bisect_left(entries, (end,))]
+
+    def after(self, group, start: float):
+        """
+
+        :param group:
+        :param start: epoch seconds, inclusive
+        :return: generator of (timestamp, key) earliest first, starting at start
+        """
+        entries = self._groups.get(group, [])
+        position = bisect.bisect_left(entries, (start,))
+        while position < len(entries):
+            entry = entries[position]
+            yield entry
+            # the caller may remove expired entries meanwhile, so find the next one again
+            position = bisect.bisect_right(entries, entry)
+
+
+def _cinema_point(cinema):
+    try:
+        return float(cinema.lat), float(cinema.lon)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class CacheStore:
+    """
+    Bounded, thread-safe LRU store with per-entry expiry for a single entity type
+
+    Supports the dict operations the rest of the module relies on. Entries past their ttl but still
+    inside the stale window are returned immediately and refreshed, in batches, by one background worker.
+    Registered indexes are only touched while holding the store's lock.
+    """
+
+    def __init__(self, policy: CachePolicy, refresh=None, indexes: dict = None, backend=None, entity: str = None,
+                 factory=None, name_index: str = None, sizeof=None):
+        """
+
+        :param policy: CachePolicy
+        :param refresh: callable([key, ...]) that re-fetches and re-stores stale entries, or None; called from one
+        worker thread per store, with every key that went stale since its previous call
+        :param indexes: {name: index}, each with add(key, value) and remove(key, value), kept in sync on
+        every insert, eviction and removal
+        :param backend: persistent backend (e.g. SQLiteCacheBackend) written through on insert and read on a miss
+        :param entity: name this store's rows are kept under in the backend
+        :param factory: callable(payload) building a model from a stored payload
+        :param name_index: HashIndex whose key is also stored in the backend, so find() can fall back to it
+        :param sizeof: callable(value) giving an entry's size in bytes, to enforce policy.max_bytes
+        """
+        self.policy = policy
+        self.refresh = refresh
+        self.indexes = (indexes if indexes else {})
+        self.backend = backend
+        self.entity = entity
+        self.factory = factory
+        self.name_index = name_index
+        self.sizeof = sizeof
+        self.lock = threading.RLock()
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._bytes = 0  # sizeof of every entry together, if sizeof is given
+        self._stale = set()  # keys waiting for the refresh worker
+        self._refreshing = set()  # keys the refresh worker is fetching
+        self._refresher = None  # the refresh worker, while it runs
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.backend_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _age(self, entry):
+        return time.monotonic() - entry[1]
+
+    def _is_dead(self, entry):
+        age = self._age(entry)
+        if age <= self.policy.ttl:
+            return False
+        return not self.refresh or age > self.policy.ttl + self.policy.stale_ttl
+
+    def _unindex(self, key, value):
+        # every removal goes through here
+        for index in self.indexes.values():
+            index.remove(key, value)
+        if self.sizeof:
+            self._bytes -= self.sizeof(value)
+
+    def _expire(self, key):
+        self._unindex(key, self._entries.pop(key)[0])
+        self.expirations += 1
+
+    def _max_age(self):
+        return self.policy.ttl + (self.policy.stale_ttl if self.refresh else 0)
+
+    def _load(self, key):
+        """
+        Build an entry from the backend after an in-memory miss; the caller holds the lock
+
+        :return: the loaded value, or _MISSING
+        """
+        if not self.backend:
+            return _MISSING
+        row = self.backend.get(self.entity, key, max_age=self._max_age())
+        if row is None:
+            return _MISSING
+        payload, age = row
+        value = self.factory(payload)
+        self._insert(key, value, time.monotonic() - age)
+        self.backend_hits += 1
+        if age > self.policy.ttl:
+            self.stale_hits += 1
+            self._revalidate(key)
+        return value
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_dead(entry):
+                self._expire(key)
+                entry = None
+            if entry is None:
+                value = self._load(key)
+                if value is _MISSING:
+                    self.misses += 1
+                    return default
+                self.hits += 1
+                return value
+            if self._age(entry) > self.policy.ttl:
+                self.stale_hits += 1
+                self._revalidate(key)
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def _revalidate(self, key):
+        # the caller holds the lock
+        if key in self._stale or key in self._refreshing:
+            return
+        self._stale.add(key)
+        if self._refresher is None:
+            self._refresher = threading.Thread(target=self._refresh_stale, daemon=True)
+            self._refresher.start()
+
+    def _refresh_stale(self):
+        time.sleep(_REFRESH_BATCH_DELAY)  # let a burst of stale reads gather into one batch
+        while True:
+            with self.lock:
+                self._refreshing = self._stale
+                self._stale = set()
+                if not self._refreshing:
+                    self._refresher = None
+                    return
+                keys = list(self._refreshing)
+            try:
+                self.refresh(keys)
+            except Exception:
+                logger.exception(f"Background refresh of {len(keys)} entries failed")
+            finally:
+                with self.lock:
+                    self._refreshing = set()
+
+    def _insert(self, key, value, stored_at):
+        if key in self._entries:
+            self._unindex(key, self._entries.pop(key)[0])
+        max_bytes = self.policy.max_bytes
+        if self.sizeof:
+            size = self.sizeof(value)
+            if max_bytes is not None and size > max_bytes:
+                return
+            self._bytes += size
+        self._entries[key] = (value, stored_at)
+        for index in self.indexes.values():
+            index.add(key, value)
+        while len(self._entries) > self.policy.maxsize or (max_bytes is not None and self._bytes > max_bytes):
+            evicted_key, (evicted_value, _) = self._entries.popitem(last=False)
+            self._unindex(evicted_key, evicted_value)
+            self.evictions += 1
+
+    def put(self, key, value, payload: dict = None):
+        """
+        Store value, writing its raw payload through to the persistent backend if there is one
+
+        :param key:
+        :param value:
+        :param payload: raw payload value was built from, needed when models don't keep their data
+        """
+        with self.lock:
+            self._insert(key, value, time.monotonic())
+            if payload is None:
+                payload = getattr(value, 'data', None)
+            if self.backend and payload is not None:
+                name = (self.indexes[self.name_index].key_func(value) if self.name_index else None)
+                self.backend.put(self.entity, key, payload, name=name)
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    def age(self, key):
+        """
+
+        :return: seconds since key was stored, or None if it isn't held in memory
+        """
+        with self.lock:
+            entry = self._entries.get(key)
+            return (None if entry is None else self._age(entry))
+
+    def setdefault(self, key, value, payload: dict = None):
+        """
+        Store value unless a live entry already exists, atomically
+
+        :return: the entry that ends up cached
+        """
+        with self.lock:
+            existing = self.get(key, _MISSING)
+            if existing is not _MISSING:
+                return existing
+            self.put(key, value, payload)
+            return value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __delitem__(self, key):
+        with self.lock:
+            self._unindex(key, self._entries.pop(key)[0])
+
+    def __contains__(self, key):
+        with self.lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._is_dead(entry)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def purge_expired(self):
+        """
+        Drop every entry that can no longer be served
+
+        :return: number of entries dropped
+        """
+        with self.lock:
+            dead = [key for key, entry in self._entries.items() if self._is_dead(entry)]
+            for key in dead:
+                self._expire(key)
+            return len(dead)
+
+    def items(self):
+        with self.lock:
+            return [(key, entry[0]) for key, entry in self._entries.items() if not self._is_dead(entry)]
+
+    def keys(self):
+        return [key for key, _ in self.items()]
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def find(self, index_name: str, index_key):
+        """
+        Look up live entries through a secondary index
+
+        :param index_name: name the index was registered under
+        :param index_key: already-normalized index key
+        :return: [value, ...]
+        """
+        results = []
+        with self.lock:
+            for key in self.indexes[index_name].get(index_key):
+                value = self.get(key, _MISSING)
+                if value is not _MISSING:
+                    results.append(value)
+            if not results and self.backend and index_name == self.name_index:
+                for key, payload, age in self.backend.find(self.entity, index_key, max_age=self._max_age()):
+                    value = self.factory(payload)
+                    self._insert(key, value, time.monotonic() - age)
+                    self.backend_hits += 1
+                    results.append(value)
+        return results
+
+    def pop(self, key, default=None):
+        with self.lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self._unindex(key, entry[0])
+            return entry[0]
+
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+            self._bytes = 0
+            for index in self.indexes.values():
+                index.clear()
+
+    def stats(self):
+        with self.lock:
+            return {'size': len(self._entries), 'maxsize': self.policy.maxsize, 'bytes': self._bytes, 'hits': self.hits,
+                    'misses': self.misses, 'stale_hits': self.stale_hits, 'backend_hits': self.backend_hits,
+                    'evictions': self.evictions, 'expirations': self.expirations}
+
+
+class SQLiteCacheBackend:
+    """
+    Persistent Cache backend keeping raw entity payloads and their fetch time in SQLite
+
+    Several processes can point at the same file (WAL mode), so warm data survives restarts and is shared
+    between workers. Writes are batched into transactions of up to commit_every rows; a batch is committed at the
+    latest commit_interval seconds after its first write, even if nothing else is written, so other processes
+    see the rows and aren't kept waiting for the write lock.
+    """
+
+    def __init__(self, path: str = 'showtimes_cache.sqlite3', commit_every: int = 256, commit_interval: float = 1.0):
+        """
+
+        :param path: database file, created if missing
+        :param commit_every: rows written before a commit
+        :param commit_interval: seconds after its first write within which a batch is committed
+        """
+        self.path = path
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._timer = None
+        self._closed = False
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS entities (entity TEXT NOT NULL, key TEXT NOT NULL, name TEXT, '
+                           'payload TEXT NOT NULL, fetched_at REAL NOT NULL, PRIMARY KEY (entity, key))')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS entities_name ON entities (entity, name)')
+
+    def _oldest(self, max_age):
+        return (time.time() - max_age if max_age is not None else 0)
+
+    def put(self, entity: str, key, payload: dict, name: str = None, fetched_at: float = None):
+        with self._lock:
+            if not self._conn.in_transaction:
+                self._conn.execute('BEGIN')
+            self._conn.execute('INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?, ?)',
+                               (entity, str(key), name, json.dumps(payload, separators=(',', ':')),
+                                (fetched_at if fetched_at else time.time())))
+            self._pending += 1
+            if self._pending >= self.commit_every or self.commit_interval <= 0:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.commit_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def get(self, entity: str, key, max_age: float = None):
+        """
+
+        :return: (payload, age in seconds), or None if missing or older than max_age
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT payload, fetched_at FROM entities WHERE entity = ? AND key = ? '
+                                     'AND fetched_at >= ?', (entity, str(key), self._oldest(max_age))).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), max(0.0, time.time() - row[1])
+
+    def find(self, entity: str, name: str, max_age: float = None):
+        """
+
+        :return: [(key, payload, age in seconds), ...]
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT key, payload, fetched_at FROM entities WHERE entity = ? AND name = ? '
+                                      'AND fetched_at >= ?', (entity, name, self._oldest(max_age))).fetchall()
+        now = time.time()
+        return [(key, json.loads(payload), max(0.0, now - fetched_at)) for key, payload, fetched_at in rows]
+
+    def count(self, entity: str, max_age: float = None):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM entities WHERE entity = ? AND fetched_at >= ?',
+                                      (entity, self._oldest(max_age))).fetchone()[0]
+
+    def purge(self, entity: str, max_age: float):
+        """
+        Delete rows older than max_age
+
+        :return: number of rows deleted
+        """
+        with self._lock:
+            self.flush()
+            return self._conn.execute('DELETE FROM entities WHERE entity = ? AND fetched_at < ?',
+                                      (entity, self._oldest(max_age))).rowcount
+
+    def clear(self, entity: str = None):
+        with self._lock:
+            self.flush()
+            if entity:
+                self._conn.execute('DELETE FROM entities WHERE entity = ?', (entity,))
+            else:
+                self._conn.execute('DELETE FROM entities')
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._closed:
+                return
+            if self._conn.in_transaction:
+                self._conn.execute('COMMIT')
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._closed = True
+            self._conn.close()
+
+
+def _backend_entity(entity: str, language: str):
+    # localized entities are kept per language in a shared backend, so clients in different languages
+    # don't read each other's titles; cinemas, showtimes and chains are shared
+    return (f'{entity}:{language}' if language and entity in LOCALIZED_FIELDS else entity)
+
+
+_LOADS_ENTITY = '_loads'  # backend rows recording when an entity's full list was last stored
+
+
+class Cache:
+    ENTITIES = ('movies', 'cinemas', 'showtimes', 'chains', 'genres', 'missing', 'queries', 'localized')
+
+    def __init__(self, parent, policies: dict = None, backend=None):
+        """
+
+        :param parent: InternationalShowtimes, used to refresh stale entries
+        :param policies: {entity: CachePolicy}, overriding DEFAULT_CACHE_POLICIES per entity type
+        :param backend: persistent backend shared across restarts and processes, e.g. SQLiteCacheBackend
+        """
+        policies = {**DEFAULT_CACHE_POLICIES, **(policies if policies else {})}
+        refresh = (parent._refresh_cached if parent else None)
+        language = getattr(parent, 'language', None)
+        self.backend = backend
+        self.movies = CacheStore(policies['movies'], refresh=(partial(refresh, 'movies') if refresh else None),
+                                 indexes={'title': HashIndex(lambda movie: _normalize_name(movie.title))},
+                                 backend=backend, entity=_backend_entity('movies', language),
+                                 factory=lambda data: Movie(data, parent),
+                                 name_index='title')
+        self.cinemas = CacheStore(policies['cinemas'], refresh=(partial(refresh, 'cinemas') if refresh else None),
+                                  indexes={'coordinates': HashIndex(lambda cinema: _coordinate_key(
+                                      getattr(cinema, 'lat', None), getattr(cinema, 'lon', None)))},
+                                  backend=backend, entity='cinemas', factory=lambda data: Cinema(data, parent))
+        self.cinemas.indexes['geo'] = GeoGridIndex(_cinema_point)
+        # circles (lat, lon, radius_km, loaded_at) whose cinemas have all been loaded from the API
+        self.cinema_areas = deque(maxlen=256)
+        self.showtimes = CacheStore(policies['showtimes'], backend=backend, entity='showtimes',
+                                    factory=partial(self._load_showtime, parent),
+                                    indexes={'cinema_time': TimeIndex(lambda showtime: showtime.cinemaId,
+                                                                      lambda showtime: showtime.startTimestamp),
+                                             'movie_time': TimeIndex(lambda showtime: showtime.movieId,
+                                                                     lambda showtime: showtime.startTimestamp)})
+        self.chains = CacheStore(policies['chains'], refresh=(partial(refresh, 'chains') if refresh else None),
+                                 indexes={'name': HashIndex(lambda chain: _normalize_name(chain.name))},
+                                 backend=backend, entity='chains', factory=lambda data: Chain(data, parent),
+                                 name_index='name')
+        self.genres = CacheStore(policies['genres'], refresh=(partial(refresh, 'genres') if refresh else None),
+                                 indexes={'name': HashIndex(lambda genre: _normalize_name(genre.name))},
+                                 backend=backend, entity=_backend_entity('genres', language),
+                                 factory=lambda data: Genre(data, parent),
+                                 name_index='name')
+        # (entity, field, value) of lookups the API had no match for, kept briefly so that repeating them
+        # doesn't download the whole list again
+        self.missing = CacheStore(policies['missing'])
+        # normalized /showtimes url -> [Showtime, ...], only filled while a RefreshScheduler runs
+        self.queries = CacheStore(policies['queries'])
+        # (entity, id, language) -> LOCALIZED_FIELDS payload, for languages other than the client's own;
+        # the stores above hold the client's language and everything shared between languages
+        self.localized = CacheStore(policies['localized'])
+
+    def _load_showtime(self, parent, data):
+        return Showtime(data, parent, movie=self.movies.get(data.get('movie_id')),
+                        cinema=self.cinemas.get(data.get('cinema_id')), skip_additional_api_calls=True)
+
+    def has_warm_movies(self):
+        """
+        Whether the persistent backend holds a full current-movies list loaded within the movies ttl, making a
+        startup download unnecessary; movies stored one at a time don't count
+        """
+        return bool(self.backend and self.backend.get(_LOADS_ENTITY, self.movies.entity,
+                                                      max_age=self.movies.policy.ttl) is not None)
+
+    def mark_movies_loaded(self):
+        """
+        Record in the persistent backend that the full current-movies list has just been stored
+        """
+        if self.backend:
+            self.backend.put(_LOADS_ENTITY, self.movies.entity, {})
+
+    def purge_expired(self):
+        """
+        Drop expired entries from memory and from the persistent backend
+
+        :return: {entity: entries dropped from memory, ...}
+        """
+        purged = {}
+        for entity in self.ENTITIES:
+            store = getattr(self, entity)
+            purged[entity] = store.purge_expired()
+            if self.backend:
+                self.backend.purge(store.entity or entity, store._max_age())
+        return purged
+
+    def stats(self):
+        """
+
+        :return: {entity: {'size': ..., 'hits': ..., 'misses': ..., ...}, ...}
+        """
+        return {entity: getattr(self, entity).stats() for entity in self.ENTITIES}
+
+    def clear(self, persistent: bool = False):
+        """
+
+        :param persistent: also delete everything from the persistent backend, for every process sharing it
+        """
+        for entity in self.ENTITIES:
+            getattr(self, entity).clear()
+        self.cinema_areas.clear()
+        if persistent and self.backend:
+            self.backend.clear()
+
+    def _missing_keys(self, entity: str, lookup: dict):
+        return [(entity, field, (_normalize_name(value) if field in ('name', 'title') else value))
+                for field, value in lookup.items() if value]
+
+    def add_missing(self, entity: str, **lookup):
+        """
+        Remember that the API has nothing matching these lookups, e.g. add_missing('genres', name='Foo')
+
+        :param entity:
+        :param lookup: {field: value, ...}; fields without a value are ignored
+        """
+        for key in self._missing_keys(entity, lookup):
+            self.missing.put(key, True)
+
+    def is_missing(self, entity: str, **lookup):
+        """
+        Whether every given lookup recently found nothing
+
+        :param entity:
+        :param lookup: {field: value, ...}; fields without a value are ignored
+        :return: bool
+        """
+        keys = self._missing_keys(entity, lookup)
+        return bool(keys) and all(self.missing.get(key) for key in keys)
+
+    def check_for_cached_movie(self, movie_id: str = None, title: str = None):
+        if not movie_id and not title:
+            raise Exception("Please provide either a movie_id or a title.")
+        if movie_id:
+            cached_movie = self.movies.get(movie_id)
+            if cached_movie:
+                return cached_movie
+        if title:
+            movies = self.movies.find('title', _normalize_name(title))
+            if movies:
+                return movies[0]
+        return None
+
+    def check_for_cached_cinema(self, cinema_id: str = None, latitude: str = None, longitude: str = None):
+        if cinema_id:
+            cached_cinema = self.cinemas.get(cinema_id)
+            if cached_cinema:
+                return cached_cinema
+        if latitude and longitude:
+            cinemas = self.cinemas.find('coordinates', _coordinate_key(latitude, longitude))
+            if cinemas:
+                return cinemas[0]
+        return None
+
+    def _resolve(self, store, matches):
+        results = []
+        for distance, key in matches:
+            value = store.get(key)
+            if value is not None:
+                results.append(value)
+        return results
+
+    def nearest_cinemas(self, latitude: float, longitude: float, count: int = 1, max_km: float = None):
+        """
+
+        :param latitude:
+        :param longitude:
+        :param count:
+        :param max_km:
+        :return: [Cinema, ...] nearest first
+        """
+        with self.cinemas.lock:
+            matches = self.cinemas.indexes['geo'].nearest(float(latitude), float(longitude), count=count,
+                                                          max_km=max_km)
+            return self._resolve(self.cinemas, matches)
+
+    def cinemas_within(self, latitude: float, longitude: float, radius_km: float):
+        """
+
+        :param latitude:
+        :param longitude:
+        :param radius_km:
+        :return: [Cinema, ...] nearest first
+        """
+        with self.cinemas.lock:
+            matches = self.cinemas.indexes['geo'].within(float(latitude), float(longitude), radius_km)
+            return self._resolve(self.cinemas, matches)
+
+    def add_cinema_area(self, latitude: float, longitude: float, radius_km: float):
+        self.cinema_areas.append((float(latitude), float(longitude), radius_km, time.monotonic()))
+
+    def is_cinema_area_cached(self, latitude: float, longitude: float, radius_km: float):
+        """
+        Whether every cinema within radius_km has already been loaded by an earlier location query
+
+        :param latitude:
+        :param longitude:
+        :param radius_km:
+        :return: bool
+        """
+        now = time.monotonic()
+        for area_lat, area_lon, area_radius, loaded_at in list(self.cinema_areas):
+            if now - loaded_at > self.cinemas.policy.ttl:
+                continue
+            if _haversine_km(float(latitude), float(longitude), area_lat, area_lon) + radius_km <= area_radius:
+                return True
+        return False
+
+    def check_for_cached_showtime(self, showtime_id: str = None):
+        if showtime_id:
+            return self.showtimes.get(showtime_id)
+        return None
+
+    def _showtime_index(self, cinema_id: str = None, movie_id: str = None):
+        if cinema_id:
+            return self.showtimes.indexes['cinema_time'], cinema_id
+        if movie_id:
+            return self.showtimes.indexes['movie_time'], movie_id
+        raise Exception("Please provide either a cinema_id or a movie_id.")
+
+    def showtimes_between(self, start, end, cinema_id: str = None, movie_id: str = None):
+        """
+        Cached showtimes starting in [start, end) at a cinema and/or for a movie
+
+        :param start: datetime, ISO 8601 string or epoch seconds
+        :param end: datetime, ISO 8601 string or epoch seconds
+        :param cinema_id:
+        :param movie_id:
+        :return: [Showtime, ...] earliest first
+        """
+        index, group = self._showtime_index(cinema_id, movie_id)
+        with self.showtimes.lock:
+            matches = index.between(group, _parse_timestamp(start), _parse_timestamp(end))
+            results = self._resolve(self.showtimes, matches)
+        if cinema_id and movie_id:
+            results = [showtime for showtime in results if showtime.movieId == movie_id]
+        return results
+
+    def next_showtimes(self, count: int = 1, after=None, cinema_id: str = None, movie_id: str = None):
+        """
+        Next cached showings at a cinema and/or for a movie
+
+        :param count:
+        :param after: datetime, ISO 8601 string or epoch seconds; defaults to now
+        :param cinema_id:
+        :param movie_id:
+        :return: [Showtime, ...] earliest first
+        """
+        index, group = self._showtime_index(cinema_id, movie_id)
+        start = (_parse_timestamp(after) if after is not None else time.time())
+        results = []
+        with self.showtimes.lock:
+            # entries that expired or belong to another movie are skipped, so walk on until count are found
+            for timestamp, key in index.after(group, start):
+                showtime = self.showtimes.get(key)
+                if showtime is None or (movie_id and showtime.movieId != movie_id):
+                    continue
+                results.append(showtime)
+                if len(results) >= count:
+                    break
+        return results
+
+    def check_for_cached_chain(self, chain_id: str = None, chain_name: str = None):
+        if chain_id:
+            cached_chain = self.chains.get(chain_id)
+            if cached_chain:
+                return cached_chain
+        if chain_name:
+            chains = self.chains.find('name', _normalize_name(chain_name))
+            if chains:
+                return chains[0]
+        return None
+
+    def check_for_cached_genre(self, genre_id: str = None, genre_name: str = None):
+        if genre_id:
+            cached_genre = self.genres.get(genre_id)
+            if cached_genre:
+                return cached_genre
+        if genre_name:
+            genres = self.genres.find('name', _normalize_name(genre_name))
+            if genres:
+                return genres[0]
+        return None
+
+
+def _int_value(value):
+    return (int(value) if value is not None and value != '' else None)
+
+
+def _address_field(name):
+    return lambda record: ((record.get('location') or {}).get('address') or {}).get(name)
+
+
+# column name -> (kind, payload field the value comes from, extractor); kinds are 'int', 'float', 'bool' and 'str'
+SHOWTIME_COLUMNS = {
+    'id': ('int', 'id', lambda record: record.get('id')),
+    'cinema_id': ('int', 'cinema_id', lambda record: record.get('cinema_id')),
+    'movie_id': ('int', 'movie_id', lambda record: record.get('movie_id')),
+    'start': ('float', 'start_at', lambda record: _parse_timestamp(record.get('start_at'))),
+    'is_3d': ('bool', 'is_3d', lambda record: record.get('is_3d')),
+    'is_imax': ('bool', 'is_imax', lambda record: record.get('is_imax')),
+    'auditorium': ('str', 'auditorium', lambda record: record.get('auditorium')),
+    'language': ('str', 'language', lambda record: record.get('language')),
+    'subtitle_language': ('str', 'subtitle_language', lambda record: record.get('subtitle_language')),
+    'booking_type': ('str', 'booking_type', lambda record: record.get('booking_type')),
+}
+CINEMA_COLUMNS = {
+    'id': ('int', 'id', lambda record: record.get('id')),
+    'chain_id': ('int', 'chain_id', lambda record: record.get('chain_id')),
+    'city_id': ('int', 'city_id', lambda record: record.get('city_id')),
+    'name': ('str', 'name', lambda record: record.get('name')),
+    'lat': ('float', 'location', lambda record: (record.get('location') or {}).get('lat')),
+    'lon': ('float', 'location', lambda record: (record.get('location') or {}).get('lon')),
+    'city': ('str', 'location', _address_field('city')),
+    'zipcode': ('str', 'location', _address_field('zipcode')),
+    'state_abbr': ('str', 'location', _address_field('state_abbr')),
+    'country_code': ('str', 'location', _address_field('country_code')),
+}
+MOVIE_COLUMNS = {
+    'id': ('int', 'id', lambda record: record.get('id')),
+    'title': ('str', 'title', lambda record: record.get('title')),
+    'original_language': ('str', 'original_language', lambda record: record.get('original_language')),
+    'runtime': ('int', 'runtime', lambda record: record.get('runtime')),
+    'imdb_id': ('str', 'imdb_id', lambda record: record.get('imdb_id')),
+    'tmdb_id': ('int', 'tmdb_id', lambda record: record.get('tmdb_id')),
+}
+
+# array typecode per kind, and the value stored for a missing one
+_COLUMN_TYPES = {'int': ('q', -1), 'float': ('d', math.nan), 'bool': ('b', -1), 'str': ('i', -1)}
+_TABLE_MAGIC = b'ISACOLS1'
+
+
+class _ColumnBuilder:
+    # appends one column's values; an 'int' column that meets a non-integer switches to 'str'
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.codes = {}  # str columns: value -> code
+        self.values = array.array(_COLUMN_TYPES[kind][0])
+
+    def _to_str(self):
+        self.kind = 'str'
+        self.codes = {}
+        previous, self.values = self.values, array.array('i')
+        for value in previous:
+            self.append(None if value == -1 else str(value))
+
+    def append(self, value):
+        if value is None:
+            self.values.append(_COLUMN_TYPES[self.kind][1])
+        elif self.kind == 'str':
+            value = str(value)
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.codes)
+            self.values.append(code)
+        elif self.kind == 'int':
+            try:
+                self.values.append(_int_value(value))
+            except (TypeError, ValueError):
+                self._to_str()
+                self.append(value)
+        elif self.kind == 'float':
+            self.values.append(float(value))
+        else:
+            self.values.append(1 if value else 0)
+
+
+class ColumnTable:
+    """
+    Column-oriented rows: numbers in typed buffers, strings dictionary-encoded
+
+    'int' columns are int64 (-1 when missing), 'float' columns float64 (NaN when missing), 'bool' columns int8
+    (-1 when missing) and 'str' columns int32 codes into dictionaries[name] (-1 when missing). Columns are
+    array.array buffers, or memoryviews over the file after load(); to_numpy() wraps them without copying.
+    """
+
+    def __init__(self, length: int, columns: dict, kinds: dict, dictionaries: dict, source=None):
+        """
+
+        :param length: rows
+        :param columns: {name: buffer}
+        :param kinds: {name: kind}
+        :param dictionaries: {name: [str, ...]} for 'str' columns
+        :param source: mmap the buffers live in, kept open with the table
+        """
+        self.length = length
+        self.columns = columns
+        self.kinds = kinds
+        self.dictionaries = dictionaries
+        self._source = source
+
+    @classmethod
+    def from_records(cls, records, spec: dict):
+        """
+        Build a table straight from raw payloads, without creating a model per row
+
+        :param records: iterable of payload dicts, e.g. a streamed response
+        :param spec: SHOWTIME_COLUMNS, CINEMA_COLUMNS, MOVIE_COLUMNS or one like them
+        :return: ColumnTable
+        """
+        builders = {name: _ColumnBuilder(kind) for name, (kind, _, _) in spec.items()}
+        extractors = [(builders[name], extract) for name, (_, _, extract) in spec.items()]
+        length = 0
+        for record in records:
+            for builder, extract in extractors:
+                builder.append(extract(record))
+            length += 1
+        return cls(length, {name: builder.values for name, builder in builders.items()},
+                   {name: builder.kind for name, builder in builders.items()},
+                   {name: list(builder.codes) for name, builder in builders.items() if builder.kind == 'str'})
+
+    def __len__(self):
+        return self.length
+
+    def column(self, name: str):
+        """
+
+        :return: the raw buffer; codes for 'str' columns
+        """
+        return self.columns[name]
+
+    def values(self, name: str):
+        """
+
+        :return: [value, ...] with strings decoded and missing values as None
+        """
+        missing = _COLUMN_TYPES[self.kinds[name]][1]
+        if self.kinds[name] == 'str':
+            dictionary = self.dictionaries[name]
+            return [(dictionary[code] if code != -1 else None) for code in self.columns[name]]
+        if self.kinds[name] == 'float':
+            return [(None if math.isnan(value) else value) for value in self.columns[name]]
+        if self.kinds[name] == 'bool':
+            return [(None if value == missing else bool(value)) for value in self.columns[name]]
+        return [(None if value == missing else value) for value in self.columns[name]]
+
+    def to_numpy(self):
+        """
+
+        :return: {name: numpy.ndarray} sharing the table's buffers
+        """
+        if numpy is None:
+            raise Exception("to_numpy() needs numpy to be installed.")
+        return {name: numpy.frombuffer(buffer, dtype=_COLUMN_TYPES[self.kinds[name]][0])
+                for name, buffer in self.columns.items()}
+
+    def save(self, path: str):
+        """
+        Write the table to one file that load() can memory-map
+
+        Layout: magic, header length (uint64), JSON header, then every column's buffer at an 8-byte aligned offset.
+        """
+        layout = []
+        offset = 0
+        for name, buffer in self.columns.items():
+            size = memoryview(buffer).nbytes
+            layout.append({'name': name, 'kind': self.kinds[name], 'offset': offset, 'nbytes': size,
+                           'dictionary': self.dictionaries.get(name)})
+            offset += (size + 7) // 8 * 8
+        header = json.dumps({'length': self.length, 'byteorder': sys.byteorder, 'columns': layout}).encode()
+        data_start = (len(_TABLE_MAGIC) + 8 + len(header) + 7) // 8 * 8
+        with open(path, 'wb') as file:
+            file.write(_TABLE_MAGIC + struct.pack('<Q', len(header)) + header)
+            for entry, buffer in zip(layout, self.columns.values()):
+                file.seek(data_start + entry['offset'])
+                file.write(memoryview(buffer).cast('B'))
+            file.truncate(data_start + offset)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Memory-map a file written by save(); columns are read lazily by the OS as they are touched
+
+        :return: ColumnTable
+        """
+        with open(path, 'rb') as file:
+            source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if source[:len(_TABLE_MAGIC)] != _TABLE_MAGIC:
+            raise Exception(f"{path} is not a column table file.")
+        header_size = struct.unpack_from('<Q', source, len(_TABLE_MAGIC))[0]
+        header_start = len(_TABLE_MAGIC) + 8
+        header = json.loads(source[header_start:header_start + header_size])
+        if header['byteorder'] != sys.byteorder:
+            raise Exception(f"{path} was written on a {header['byteorder']}-endian machine.")
+        data_start = (header_start + header_size + 7) // 8 * 8
+        view = memoryview(source)
+        columns, kinds, dictionaries = {}, {}, {}
+        for entry in header['columns']:
+            start = data_start + entry['offset']
+            typecode = _COLUMN_TYPES[entry['kind']][0]
+            columns[entry['name']] = view[start:start + entry['nbytes']].cast(typecode)
+            kinds[entry['name']] = entry['kind']
+            if entry['dictionary'] is not None:
+                dictionaries[entry['name']] = entry['dictionary']
+        return cls(header['length'], columns, kinds, dictionaries, source=source)
+
+
+SyncResult = namedtuple('SyncResult', ['added', 'changed', 'removed', 'showtimes'])
+SyncResult.__doc__ = """
+Outcome of one sync_showtimes call
+
+added, changed, removed: counts of showtimes
+showtimes: [Showtime, ...] tracked for the query after the sync, earliest first
+"""
+
+
+class RefreshScheduler:
+    """
+    Background thread that keeps the most requested movies, cinemas and showtimes queries fresh
+
+    Every get_movie(movie_id=...), get_cinemas(cinema_id=...) and get_showtimes() call counts towards the
+    entry's score, which halves every half_life seconds. Each cycle the hottest entries that are missing or
+    within refresh_ahead of their ttl are re-fetched, hottest first, movies and cinemas in batches of
+    _IDS_PER_REQUEST. Once a day at prefetch_hour the next day's showtimes of the hottest cinemas are
+    fetched as well. Requests are spent from a budget of requests_per_minute, counted as they go out, so
+    every page and hydration batch of a showtimes query is charged; what doesn't fit waits for the next cycle,
+    and a cycle that overspends borrows from the following ones. Only the scheduler's own requests are counted,
+    not those the client makes from other threads meanwhile. Start one with InternationalShowtimes.start_scheduler().
+    """
+    KINDS = ('movies', 'cinemas', 'showtimes')
+
+    def __init__(self, client, requests_per_minute: float = 60, interval: float = 30, refresh_ahead: float = 0.2,
+                 top: int = 100, half_life: float = 60 * 60, prefetch_hour: int = 23, prefetch_cinemas: int = 20,
+                 max_tracked: int = 10000):
+        """
+
+        :param client: InternationalShowtimes
+        :param requests_per_minute: upstream requests the scheduler may make, on top of the client's own
+        :param interval: seconds between cycles
+        :param refresh_ahead: fraction of an entry's ttl before expiry from which it is refreshed
+        :param top: entries per kind considered for refreshing each cycle
+        :param half_life: seconds after which an access counts half as much
+        :param prefetch_hour: local hour at which the next day's showtimes are prefetched, None to never
+        :param prefetch_cinemas: hottest cinemas whose next day's showtimes are prefetched
+        :param max_tracked: entries per kind whose score is kept, the coldest are forgotten beyond it
+        """
+        self.client = client
+        self.requests_per_minute = requests_per_minute
+        self.interval = interval
+        self.refresh_ahead = refresh_ahead
+        self.top = top
+        self.half_life = half_life
+        self.prefetch_hour = prefetch_hour
+        self.prefetch_cinemas = prefetch_cinemas
+        self.max_tracked = max_tracked
+        self._scores = {kind: {} for kind in self.KINDS}  # kind -> {key: score}
+        self._queries = {}  # normalized url -> url as built by the client
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._allowance = 0.0
+        self._updated = time.monotonic()
+        self._prefetched_on = None
+        self._prefetch_queue = deque()
+        self.cycles = 0
+        self.requests = 0
+        self.refreshed = {kind: 0 for kind in self.KINDS}
+        self.prefetched = 0
+        self.deferred = 0
+
+    def touch(self, kind: str, key, url: str = None):
+        """
+        Count one access
+
+        :param kind: 'movies', 'cinemas' or 'showtimes'
+        :param key: movie or cinema id, or normalized /showtimes url
+        :param url: for showtimes, the url to refresh the query with
+        """
+        with self._lock:
+            scores = self._scores[kind]
+            scores[key] = scores.get(key, 0.0) + 1.0
+            if url:
+                self._queries[key] = url
+
+    def hottest(self, kind: str, count: int = None):
+        """
+
+        :return: [(key, score), ...], hottest first
+        """
+        with self._lock:
+            scores = list(self._scores[kind].items())
+        return heapq.nlargest((count if count else self.top), scores, key=lambda item: item[1])
+
+    def _decay(self, seconds: float):
+        factor = 0.5 ** (seconds / self.half_life)
+        with self._lock:
+            for kind, scores in self._scores.items():
+                for key in list(scores):
+                    scores[key] *= factor
+                    if scores[key] < 0.01:
+                        del scores[key]
+                        self._queries.pop(key, None)
+                if len(scores) > self.max_tracked:
+                    for key, _ in heapq.nsmallest(len(scores) - self.max_tracked, scores.items(),
+                                                  key=lambda item: item[1]):
+                        del scores[key]
+                        self._queries.pop(key, None)
+
+    def _store(self, kind: str):
+        return getattr(self.client.cache, ('queries' if kind == 'showtimes' else kind))
+
+    def _due(self):
+        """
+
+        :return: [(score, kind, key), ...] of hot entries missing from the cache or about to expire, hottest first
+        """
+        due = []
+        for kind in self.KINDS:
+            store = self._store(kind)
+            threshold = store.policy.ttl * (1 - self.refresh_ahead)
+            for key, score in self.hottest(kind):
+                if kind == 'showtimes' and key not in self._queries:
+                    continue
+                age = store.age(key)
+                if age is None or age >= threshold:
+                    due.append((score, kind, key))
+        return sorted(due, key=lambda item: item[0], reverse=True)
+
+    def _charge(self, tally: list, func, *args):
+        """
+        Call func and take the requests it sent from the budget
+
+        :param tally: from CountingTransport.counting()
+        :return: requests sent
+        """
+        before = tally[0]
+        func(*args)
+        sent = tally[0] - before
+        self._allowance -= sent
+        return sent
+
+    def run_once(self):
+        """
+        Run one cycle: refresh what is due, then prefetch, within the request budget
+
+        :return: requests made
+        """
+        now = time.monotonic()
+        elapsed, self._updated = now - self._updated, now
+        self._decay(elapsed)
+        # unspent budget carries over, but never more than a minute's worth; overspending is paid back first
+        self._allowance = min(max(1.0, self.requests_per_minute),
+                              self._allowance + elapsed * self.requests_per_minute / 60)
+        client = self.client
+        with client.request_counter.counting() as tally:
+            batches = {'movies': [], 'cinemas': []}
+            for _, kind, key in self._due():
+                if kind in batches:
+                    if len(batches[kind]) % _IDS_PER_REQUEST == 0:
+                        if self._allowance < 1:
+                            self.deferred += 1
+                            continue
+                        self._allowance -= 1  # reserved now, settled against what the batch really sends
+                    batches[kind].append(key)
+                elif self._allowance >= 1:
+                    self._charge(tally, self._refresh_query, key)
+                else:
+                    self.deferred += 1
+            for kind, ids in batches.items():
+                if ids:
+                    self._allowance += -(-len(ids) // _IDS_PER_REQUEST)
+                    self._charge(tally, client._refresh_cached_batch, kind, ids)
+                    self.refreshed[kind] += len(ids)
+            self._queue_prefetch()
+            while self._prefetch_queue and self._allowance >= 1:
+                self._charge(tally, self._prefetch, *self._prefetch_queue.popleft())
+        self.requests += tally[0]
+        self.cycles += 1
+        return tally[0]
+
+    def _refresh_query(self, key):
+        with self._lock:
+            url = self._queries.get(key)
+        if url and self.client._refresh_showtimes_query(url) is not None:
+            self.refreshed['showtimes'] += 1
+
+    def _queue_prefetch(self):
+        if self.prefetch_hour is None:
+            return
+        today = datetime.now()
+        if today.hour != self.prefetch_hour or self._prefetched_on == today.date():
+            return
+        self._prefetched_on = today.date()
+        start_day = (today + timedelta(days=1)).strftime('%m/%d/%y')
+        end_day = (today + timedelta(days=2)).strftime('%m/%d/%y')
+        for cinema_id, _ in self.hottest('cinemas', self.prefetch_cinemas):
+            self._prefetch_queue.append((cinema_id, start_day, end_day))
+
+    def _prefetch(self, cinema_id, start_day: str, end_day: str):
+        client = self.client
+        query = client._showtimes_query(cinema=Cinema({'id': cinema_id}, client), startDay=start_day,
+                                        endDay=end_day)
+        if client._refresh_showtimes_query(query) is not None:
+            self.prefetched += 1
+            # seeded half as hot as its cinema, so it is kept fresh for as long as the cinema stays hot
+            with self._lock:
+                score = self._scores['cinemas'].get(cinema_id, 0.0) / 2
+                key = normalize_url(query)
+                self._scores['showtimes'][key] = max(score, self._scores['showtimes'].get(key, 0.0))
+                self._queries[key] = query
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception('Refresh cycle failed')
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._updated = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='showtimes-refresh', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self):
+        """
+
+        :return: {'cycles': ..., 'requests': ..., 'refreshed': {kind: ...}, 'prefetched': ..., 'deferred': ...,
+        'tracked': {kind: ...}}
+        """
+        with self._lock:
+            tracked = {kind: len(scores) for kind, scores in self._scores.items()}
+        return {'cycles': self.cycles, 'requests': self.requests, 'refreshed': dict(self.refreshed),
+                'prefetched': self.prefetched, 'deferred': self.deferred, 'tracked': tracked}
+
+
+def _fingerprint(showtime_data):
+    # updated_at when the API sends it, else the whole record
+    return showtime_data.get('updated_at') or json.dumps(showtime_data, sort_keys=True)
+
+
+class InternationalShowtimes:
+    def __init__(self, api_key: str, language: str = None, transport=None, cache_policies: dict = None,
+                 cache_backend=None, lazy: bool = False, keep_raw: bool = True, json_loads=None,
+                 requests_per_second: float = None, per_page: int = _PER_PAGE, page_workers: int = 4,
+                 conditional_requests: bool = True, metrics: Metrics = None, base_url: str = None):
+        """
+
+        :param api_key:
+        :param language:
+        :param transport: HTTPTransport, or any object with the same get() signature
+        :param cache_policies: {entity: CachePolicy}, e.g. {'showtimes': CachePolicy(50000, 300, 0)}
+        :param cache_backend: persistent backend such as SQLiteCacheBackend; if it already holds fresh movies,
+        the startup movie download is skipped
+        :param lazy: make no requests until first use (call warm_up() to preload current movies),
+        and build each Movie's nested objects the first time they are read
+        :param keep_raw: keep each model's raw payload in its data attribute; False saves roughly half the memory
+        :param json_loads: callable(bytes) decoding response bodies; defaults to orjson if installed, else json
+        :param requests_per_second: upstream request budget shared by every call, unlimited if None
+        :param per_page: page size requested from list endpoints
+        :param page_workers: pages of one list fetched concurrently once the total count is known
+        :param conditional_requests: keep validated responses and revalidate them with If-None-Match/
+        If-Modified-Since, see ConditionalTransport
+        :param metrics: Metrics to record upstream requests into; see metrics_snapshot(), metrics_text()
+        and serve_metrics()
+        :param base_url: API root to send requests to instead of the public one, e.g. a local
+        showtimes_proxy.ShowtimesProxy
+        """
+        self.key = api_key
+        self.baseUrl = (base_url.rstrip('/') if base_url else 'https://api.internationalshowtimes.com/v4')
+        self.headers = {'x-api-key': self.key}
+        self.language = (language if language else "en")
+        self.transport = (transport if transport else HTTPTransport())
+        self.metrics = metrics
+        if self.metrics:
+            self.transport = InstrumentedTransport(self.transport, self.metrics)
+        self.rate_limiter = (RateLimiter(requests_per_second) if requests_per_second else None)
+        if self.rate_limiter:
+            self.transport = RateLimitedTransport(self.transport, self.rate_limiter)
+        # counts the requests made by one caller, e.g. a RefreshScheduler cycle, whatever threads they run on
+        self.request_counter = CountingTransport(self.transport)
+        self.transport = self.request_counter
+        if conditional_requests:
+            self.transport = ConditionalTransport(self.transport)
+        self.per_page = per_page
+        self.page_workers = page_workers
+        self.cache = Cache(self, policies=cache_policies, backend=cache_backend)
+        self._flights = SingleFlight()
+        self._city_ids = {}  # (normalized city name, countries) -> [city_id, ...]
+        self._syncs = {}  # normalized showtimes url -> {'synced_at': ..., 'full_at': ..., 'showtimes': {...}}
+        self._sync_lock = threading.Lock()
+        self.lazy = lazy
+        self.keep_raw = keep_raw
+        self.json_loads = (json_loads if json_loads else _json_loads)
+        self.decode_stats = DecodeStats()
+        self.scheduler = None
+        if not lazy:
+            self.warm_up()
+
+    def warm_up(self):
+        """
+        Preload the current movies, unless the persistent cache backend already holds fresh ones
+        """
+        if not self.cache.has_warm_movies():
+            self.get_all_current_movies()
+
+    def _get(self, url, stream: bool = False):
+        return _get_request(url=url, headers=self.headers, stream=stream, transport=self.transport)
+
+    def _get_json(self, url):
+        """
+        GET a url and decode its JSON body; concurrent identical requests share one call and its parsed result
+
+        :param url:
+        :return: dict, or None if the request failed
+        """
+        return self._flights.do(normalize_url(url), partial(self._fetch_json, url))
+
+    def _iter_pages(self, url, key: str):
+        """
+        Yield every page of a list endpoint in order
+
+        The first page's meta_info gives the total count; the remaining pages are then fetched concurrently
+        (up to page_workers at a time, within the client's request budget). Without a total, pages are walked
+        one by one until a short page comes back.
+
+        :param url: list url, already carrying query parameters
+        :param key: name of the list in the response, e.g. 'cinemas'
+        :return: generator of decoded page envelopes; None is yielded in place of a page that failed, and nothing
+        follows it
+        """
+        first = self._get_json(f'{url}&page=1&per_page={self.per_page}')
+        if first is None:
+            return
+        yield first
+        received = len(first.get(key) or [])
+        meta = first.get('meta_info') or {}
+        total = _meta_int(meta, 'total_count', 'total')
+        if total is None:
+            page = 1
+            while received >= self.per_page and page < _MAX_PAGES:
+                page += 1
+                envelope = self._get_json(f'{url}&page={page}&per_page={self.per_page}')
+                yield envelope
+                if envelope is None:
+                    return
+                received = len(envelope.get(key) or [])
+            return
+        # the API may cap per_page below what was asked for
+        per_page = _meta_int(meta, 'per_page') or (received if received else self.per_page)
+        pages = math.ceil(total / per_page)
+        if pages <= 1:
+            return
+        pool = ThreadPoolExecutor(max_workers=max(1, min(self.page_workers, pages - 1)))
+        try:
+            # each page runs in a copy of the caller's context, so CountingTransport.counting() covers it
+            futures = [pool.submit(contextvars.copy_context().run, self._get_json,
+                                   f'{url}&page={page}&per_page={per_page}')
+                       for page in range(2, pages + 1)]
+            for future in futures:
+                envelope = future.result()
+                yield envelope
+                if envelope is None:
+                    return
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _get_all_pages(self, url, key: str):
+        """
+        Fetch every page of a list endpoint and merge them into one envelope
+
+        :return: dict, or None if any page failed
+        """
+        merged = None
+        for envelope in self._iter_pages(url, key):
+            if envelope is None:
+                return None
+            if merged is None:
+                merged = {name: (list(value) if isinstance(value, list) else value)
+                          for name, value in envelope.items()}
+                continue
+            for name, value in envelope.items():  # the list itself, plus appended movies/cinemas
+                if isinstance(value, list):
+                    merged.setdefault(name, []).extend(value)
+        return merged
+
+    def iter_pages(self, endpoint: str, fields=None, **params):
+        """
+        Lazily walk a list endpoint page by page
+
+        :param endpoint: 'movies', 'cinemas', 'showtimes' or 'chains'
+        :param fields: projection for movies or cinemas, a preset name from FIELD_PRESETS or a list of API fields
+        :param params: extra query parameters, e.g. countries='US'
+        :return: generator of [Movie, ...], [Cinema, ...], [Showtime, ...] or [Chain, ...], one list per page;
+        raises an Exception if a page after the first fails
+        """
+        builders = {'movies': self._cache_movie, 'cinemas': self._cache_cinema, 'showtimes': self._cache_showtime,
+                    'chains': self._cache_chain}
+        if endpoint not in builders:
+            raise Exception(f"Pagination is not supported for {endpoint}.")
+        fields = (_resolve_fields(endpoint, fields) if endpoint in FIELD_PRESETS else None)
+        query = f'{self.baseUrl}/{endpoint}?lang={self.language}{_fields_param(fields)}'
+        if params:
+            query += f'&{urlencode(params)}'
+        for page, envelope in enumerate(self._iter_pages(query, endpoint), 1):
+            if envelope is None:
+                if page == 1:
+                    return
+                raise Exception(f"Failed to fetch page {page} of {endpoint}, the list is incomplete.")
+            yield [builders[endpoint](_project(item_data, fields)) for item_data in envelope.get(endpoint) or []]
+
+    def _fetch_json(self, url):
+        res = self._get(url)
+        if not res:
+            return None
+        content = res.content
+        started = time.perf_counter()
+        envelope = self.json_loads(content)
+        self.decode_stats.record(_endpoint_name(url), time.perf_counter() - started, len(content))
+        return envelope
+
+    def start_scheduler(self, **options):
+        """
+        Start refreshing the most requested movies, cinemas and showtimes in the background
+
+        While it runs, get_showtimes() results are also kept in Cache.queries and served from there.
+
+        :param options: RefreshScheduler options, e.g. requests_per_minute=30, prefetch_hour=None
+        :return: RefreshScheduler
+        """
+        if self.scheduler:
+            self.scheduler.stop()
+        self.scheduler = RefreshScheduler(self, **options).start()
+        return self.scheduler
+
+    def stop_scheduler(self):
+        if self.scheduler:
+            self.scheduler.stop()
+            self.scheduler = None
+        self.cache.queries.clear()
+
+    def close(self):
+        """
+        Close the pooled connections held by the transport
+        """
+        if self.scheduler:
+            self.scheduler.stop()
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
+        if self.cache.backend:
+            self.cache.backend.flush()
+
+    def get_genre(self, genre_id: str = None, genre_name: str = None):
+        """
+
+        :param genre_id:
+        :param genre_name:
+        :return: [Genre, ...]
+        """
+        cached_genre = self.cache.check_for_cached_genre(genre_id=genre_id, genre_name=genre_name)
+        if cached_genre:
+            return [cached_genre]
+        if self.cache.is_missing('genres', id=genre_id, name=genre_name):
+            return []
+        results = []
+        query = f'{self.baseUrl}/genres?lang={self.language}'
+        data = self._get_json(query)
+        if data and data.get('genres'):
+            for genre_data in data['genres']:
+                cached_genre = self.cache.check_for_cached_genre(genre_id=genre_data['id'])
+                if cached_genre:
+                    results.append(cached_genre)
+                else:
+                    new_genre = Genre(genre_data, self)
+                    self.cache.genres.put(genre_data['id'], new_genre, genre_data)
+                    results.append(new_genre)
+        if genre_id or genre_name:
+            filtered = []
+            for genre in results:
+                if (genre_id and genre_id == genre.id) or (genre_name and genre_name == genre.name):
+                    filtered.append(genre)
+            results = filtered
+            if not results and data is not None:
+                self.cache.add_missing('genres', id=genre_id, name=genre_name)
         return results
 
-    def get_movie(self, title: str = None, movie_id: str = None):
+    def get_all_current_movies(self, cinema_id: str = None, fields=None):
+        """
+
+        :param cinema_id:
+        :param fields: preset name from FIELD_PRESETS or a list of API fields; left-out fields are fetched on first read
+        :return: [Movie, ...]
+        """
+        results = []
+        fields = _resolve_fields('movies', fields)
+        query = f'{self.baseUrl}/movies?lang={self.language}{_fields_param(fields)}'
+        if cinema_id:
+            query = f'{query}&cinema_id={cinema_id}'
+        data = self._get_all_pages(query, 'movies')
+        if data and data.get('movies'):
+            for movie_data in data['movies']:
+                movie_data = _project(movie_data, fields)
+                if fields:  # don't trade a fuller cached movie for a projected one
+                    cached_movie = self.cache.check_for_cached_movie(movie_id=movie_data['id'])
+                    if cached_movie and _covers(cached_movie, movie_data):
+                        results.append(cached_movie)
+                        continue
+                new_movie = Movie(movie_data, self)
+                self.cache.movies.put(movie_data['id'], new_movie, movie_data)
+                results.append(new_movie)
+            if not cinema_id and not fields:
+                self.cache.mark_movies_loaded()
+        return results
+
+    def get_upcoming_movies(self, fields=None):
+        """
+
+        :param fields: preset name from FIELD_PRESETS or a list of API fields; left-out fields are fetched on first read
+        :return: [Movie, ...]
+        """
+        results = []
+        fields = _resolve_fields('movies', fields)
+        tomorrow = _get_midnight(datetime.today() + timedelta(days=1))
+        query = f'{self.baseUrl}/movies?lang={self.language}&include_upcoming=true&release_date_from={tomorrow}'
+        data = self._get_all_pages(query + _fields_param(fields), 'movies')
+        if data and data.get('movies'):
+            for movie_data in data['movies']:
+                results.append(self._cache_movie(_project(movie_data, fields)))
+        return results
+
+    def get_movie(self, title: str = None, movie_id: str = None, fields=None):
         """
         :param title:
         :param movie_id:
+        :param fields: preset name from FIELD_PRESETS or a list of API fields; left-out fields are fetched on first read
         :return: [Movie, ...]
         """
         if not title and not movie_id:
             raise Exception("Please provide a title or a movie_id.")
+        if self.scheduler and movie_id:
+            self.scheduler.touch('movies', movie_id)
         cached_movie = self.cache.check_for_cached_movie(movie_id=movie_id, title=title)
         if cached_movie:
             return [cached_movie]
+        lookup = ({'id': movie_id} if movie_id else {'title': title})
+        if self.cache.is_missing('movies', **lookup):
+            return []
         results = []
+        data = None
+        fields = _resolve_fields('movies', fields)
         if movie_id:
-            query = f'{self.baseUrl}/movies/{movie_id}?lang={self.language}'
-            res = _get_request(url=query,
-                               headers=self.headers)
-            if res and res.json().get('movies'):
-                for movie_data in res.json()['movies']:
-                    cached_movie = self.cache.check_for_cached_movie(movie_id=movie_data['id'])
-                    if cached_movie:
-                        results.append(cached_movie)
-                    else:
-                        new_movie = Movie(movie_data, self)
-                        self.cache.movies[movie_data['id']] = new_movie
-                        results.append(new_movie)
+            query = f'{self.baseUrl}/movies/{movie_id}?lang={self.language}{_fields_param(fields)}'
+            data = self._get_json(query)
+            if data and data.get('movies'):
+                for movie_data in data['movies']:
+                    results.append(self._cache_movie(_project(movie_data, fields)))
         elif title:
-            title = quote(title)
-            query = f'{self.baseUrl}/movies?lang={self.language}&search_query={title}&search_field=title'
-            res = _get_request(url=query,
-                               headers=self.headers)
-            if res and res.json().get('movies'):
-                for movie_data in res.json()['movies']:
-                    cached_movie = self.cache.check_for_cached_movie(movie_id=movie_data['id'])
-                    if cached_movie:
-                        results.append(cached_movie)
-                    else:
-                        new_movie = Movie(movie_data, self)
-                        self.cache.movies[movie_data['id']] = new_movie
-                        results.append(new_movie)
+            query = f'{self.baseUrl}/movies?lang={self.language}&search_query={quote(title)}&search_field=title'
+            data = self._get_json(query + _fields_param(fields))
+            if data and data.get('movies'):
+                for movie_data in data['movies']:
+                    results.append(self._cache_movie(_project(movie_data, fields)))
         else:
             all_movies = self.get_all_current_movies()
             results = filter_movies(all_movies, movie_id=movie_id)
+        if not results and data is not None:
+            self.cache.add_missing('movies', **lookup)
         return results
 
     def get_cinemas(self, name: str = None, city: str = None, zip_code: int = None, state: str = None,
-                    latitude: str = None, longitude: str = None, cinema_id: str = None):
+                    latitude: str = None, longitude: str = None, cinema_id: str = None, nearest: int = None,
+                    radius_km: float = None, country_codes: list = None, fields=None):
         """
 
         :param name:
@@ -438,41 +2866,120 @@ class InternationalShowtimes:
         :param latitude:
         :param longitude:
         :param cinema_id:
+        :param nearest: with latitude and longitude, return up to this many cinemas, nearest first
+        :param radius_km: with latitude and longitude, return the cinemas within this distance, nearest first
+        :param country_codes: only search cinemas in these countries, e.g. ['US']
+        :param fields: preset name from FIELD_PRESETS or a list of API fields; left-out fields are fetched on first read
         :return: [Cinema, ...]
         """
+        fields = _resolve_fields('cinemas', fields)
+        if latitude and longitude and (nearest or radius_km):
+            return self._get_nearby_cinemas(latitude=latitude, longitude=longitude, nearest=nearest,
+                                            radius_km=radius_km, fields=fields)
+        if self.scheduler and cinema_id:
+            self.scheduler.touch('cinemas', cinema_id)
         cached_cinema = self.cache.check_for_cached_cinema(cinema_id=cinema_id, latitude=latitude, longitude=longitude)
         if cached_cinema:
             return [cached_cinema]
-        if cinema_id:  # try searching by cinema_id first for a single cinema
-            query = f"{self.baseUrl}/cinemas/{cinema_id}?lang={self.language}"  # this always fails at the moment
-            res = _get_request(url=query, headers=self.headers)
-            if res and res.json().get('cinemas'):
-                new_cinema = Cinema(res.json['cinemas'][0], self)
-                self.cache.cinemas[res.json['cinemas'][0]['id']] = new_cinema
-                return [new_cinema]
-        # otherwise, grab all cinemas and filter by parameters
+        if self.cache.is_missing('cinemas', id=cinema_id):
+            return []
+        if cinema_id:  # a single cinema is fetched by id rather than searched for
+            data = self._get_json(f"{self.baseUrl}/cinemas?lang={self.language}&ids={cinema_id}{_fields_param(fields)}")
+            if data and data.get('cinemas'):
+                return [self._cache_cinema(_project(data['cinemas'][0], fields))]
+            if data is not None:
+                self.cache.add_missing('cinemas', id=cinema_id)
+            return []
+        # otherwise, let the API narrow the list as far as it can and filter the rest locally
         results = []
-        query = f"{self.baseUrl}/cinemas?lang={self.language}"
-        if latitude and longitude:  # narrow down initial result set if possible
-            query += f"&location={latitude},{longitude}"
-        res = _get_request(url=query, headers=self.headers)
-        if res and res.json().get('cinemas'):
-            filtered = filter_cinemas(data=res.json()['cinemas'], name=name, city=city, zip_code=zip_code, state=state,
-                                      cinema_id=cinema_id)
-            if filtered:
-                for cinema_data in filtered:
-                    cached_cinema = self.cache.check_for_cached_cinema(cinema_id=cinema_data['id'])
-                    if cached_cinema:
-                        results.append(cached_cinema)
-                    else:
-                        new_cinema = Cinema(cinema_data, self)
-                        self.cache.cinemas[cinema_data['id']] = new_cinema
-                        results.append(new_cinema)
+        query = self._plan_cinema_query(name=name, city=city, latitude=latitude, longitude=longitude,
+                                        country_codes=country_codes, fields=fields)
+        data = self._get_all_pages(query, 'cinemas')
+        if data and data.get('cinemas'):
+            for cinema_data in filter_cinemas(data=data['cinemas'], name=name, city=city, zip_code=zip_code,
+                                              state=state):
+                results.append(self._cache_cinema(_project(cinema_data, fields)))
         return results
 
+    def _plan_cinema_query(self, name: str = None, city: str = None, latitude: str = None, longitude: str = None,
+                           country_codes: list = None, fields: tuple = None):
+        """
+        Translate cinema filters into upstream query parameters where the API supports them
+
+        name becomes a search_query on the name field and city becomes city_ids, resolved through /cities. The
+        API's search is fuzzy, so callers still apply the exact filters to whatever comes back; zip code and state
+        have no upstream parameter and are only filtered locally.
+
+        :param fields: resolved projection, passed on as fields
+        :return: cinemas list url
+        """
+        params = {'lang': self.language}
+        if fields:
+            params['fields'] = ','.join(fields)
+        if latitude and longitude:
+            params['location'] = f'{latitude},{longitude}'
+        if country_codes:
+            params['countries'] = ','.join(country_codes)
+        if name:
+            params['search_query'] = name
+            params['search_field'] = 'name'
+        elif city:  # resolving a city costs a request, only worth it when the name didn't narrow things down
+            city_ids = self._get_city_ids(city, country_codes=country_codes)
+            if city_ids:
+                params['city_ids'] = ','.join(city_ids)
+        return f"{self.baseUrl}/cinemas?{urlencode(params, safe=',')}"
+
+    def _get_city_ids(self, city: str, country_codes: list = None):
+        """
+        Ids of the cities named city, remembered for the lifetime of the client
+
+        :param city:
+        :param country_codes:
+        :return: [city_id, ...], empty if the city could not be resolved
+        """
+        countries = ','.join(country_codes) if country_codes else ''
+        key = (_normalize_name(city), countries)
+        if key not in self._city_ids:
+            params = {'lang': self.language, 'search_query': city}
+            if countries:
+                params['countries'] = countries
+            data = self._get_json(f"{self.baseUrl}/cities?{urlencode(params, safe=',')}")
+            if data is None:
+                return []  # don't remember a failed lookup
+            self._city_ids[key] = [city_data['id'] for city_data in data.get('cities') or []
+                                   if _normalize_name(city_data.get('name')) == key[0]]
+        return self._city_ids[key]
+
+    def _get_nearby_cinemas(self, latitude: str, longitude: str, nearest: int = None, radius_km: float = None,
+                            fields: tuple = None):
+        """
+        Answer nearest/radius queries from the spatial index, only calling the API the first time an area is seen
+
+        :param latitude:
+        :param longitude:
+        :param nearest:
+        :param radius_km: defaults to _NEARBY_RADIUS_KM for nearest-only queries
+        :param fields: resolved projection
+        :return: [Cinema, ...] nearest first
+        """
+        radius_km = (radius_km if radius_km else _NEARBY_RADIUS_KM)
+        if not self.cache.is_cinema_area_cached(latitude, longitude, radius_km):
+            # load a wider circle than asked for, so it also covers queries up to radius_km * (_NEARBY_PADDING - 1)
+            # away from this one
+            area_km = radius_km * _NEARBY_PADDING
+            query = f"{self.baseUrl}/cinemas?lang={self.language}&location={latitude},{longitude}&distance={area_km}"
+            data = self._get_all_pages(query + _fields_param(fields), 'cinemas')
+            if data is not None:
+                for cinema_data in data.get('cinemas') or []:
+                    self._cache_cinema(_project(cinema_data, fields))
+                self.cache.add_cinema_area(latitude, longitude, area_km)
+        if nearest:
+            return self.cache.nearest_cinemas(latitude, longitude, count=nearest, max_km=radius_km)
+        return self.cache.cinemas_within(latitude, longitude, radius_km)
+
     def get_showtimes(self, movie: Movie = None, title: str = None, cinema: Cinema = None, latitude: str = None,
                       longitude: str = None, startDay: str = None, endDay: str = None, showtime_id: str = None,
-                      skip_cinemas: bool = False):
+                      skip_cinemas: bool = False, fields=None):
         """
 
         :param movie:
@@ -484,47 +2991,539 @@ class InternationalShowtimes:
         :param endDay:
         :param showtime_id:
         :param skip_cinemas:
+        :param fields: projection for the attached movies and cinemas, a preset name from FIELD_PRESETS or
+        {'movies': ..., 'cinemas': ...}; they are then fetched by id instead of appended in full to the response
         :return: [Showtime, ...]
         """
         cached_showtime = self.cache.check_for_cached_showtime(showtime_id=showtime_id)
         if cached_showtime:
             return [cached_showtime]
+        query = self._showtimes_query(movie=movie, title=title, cinema=cinema, latitude=latitude, longitude=longitude,
+                                      startDay=startDay, endDay=endDay, append=(fields is None))
+        if not query:
+            return []
+        results = None
+        scheduler = self.scheduler
+        if scheduler:
+            key = normalize_url(query)
+            scheduler.touch('showtimes', key, url=query)
+            if cinema:
+                scheduler.touch('cinemas', cinema.id)
+            cached = self.cache.queries.get(key)
+            if cached is not None:
+                results = list(cached)
+        if results is None:
+            results = self._load_showtimes(query)
+            if results is None:
+                return []
+            if scheduler:
+                self.cache.queries.put(key, list(results))
+        if results and not skip_cinemas:
+            self._hydrate_showtimes(results, fields=fields)
+        return results
+
+    def _load_showtimes(self, query: str, replace: bool = False):
+        """
+        Fetch the showtimes of a /showtimes url, building the movies and cinemas appended to it once each
+
+        :param query:
+        :param replace: rebuild showtimes that are already cached instead of reusing them, for refreshes
+        :return: [Showtime, ...], or None if the request failed
+        """
+        envelope = self._get_all_pages(query, 'showtimes')
+        if envelope is None:
+            return None
+        movies = {movie_data['id']: self._cache_movie(movie_data) for movie_data in envelope.get('movies') or []}
+        cinemas = {cinema_data['id']: self._cache_cinema(cinema_data) for cinema_data in envelope.get('cinemas') or []}
         results = []
+        for showtime_data in envelope.get('showtimes') or []:
+            movie = movies.get(showtime_data.get('movie_id'))
+            cinema = cinemas.get(showtime_data.get('cinema_id'))
+            if replace:
+                showtime = Showtime(showtime_data, self, movie=movie, cinema=cinema, skip_additional_api_calls=True)
+                self.cache.showtimes.put(showtime_data['id'], showtime, showtime_data)
+            else:
+                showtime = self._cache_showtime(showtime_data, movie=movie, cinema=cinema)
+            results.append(showtime)
+        return results
+
+    def _refresh_showtimes_query(self, query: str):
+        """
+        Re-fetch a showtimes query into Cache.queries, with its movies and cinemas attached; used by RefreshScheduler
+
+        :return: [Showtime, ...], or None if the request failed
+        """
+        results = self._load_showtimes(query, replace=True)
+        if results is None:
+            return None
+        self._hydrate_showtimes(results)
+        self.cache.queries.put(normalize_url(query), results)
+        return results
+
+    def _showtimes_query(self, movie: Movie = None, title: str = None, cinema: Cinema = None, latitude: str = None,
+                         longitude: str = None, startDay: str = None, endDay: str = None, append: bool = True):
+        """
+
+        :param append: ask for the movies and cinemas referenced by the showtimes in the same response
+        :return: the /showtimes url, or None if title matches no movie
+        """
         query = f"{self.baseUrl}/showtimes?lang={self.language}&append=cinemas&append=movies"  # times for all movies at all cinemas (default)
         if latitude and longitude:
             query += f"&location={latitude},{longitude}"
-        if cinema and (movie or title):  # times for a particular movie at a particular cinema
-            if not movie:
-                movie = self.get_movie(title=title)
-                if movie:
-                    query = f"{self.baseUrl}/showtimes?lang={self.language}&cinema_id={cinema.id}&movie_id={movie[0].id}"
+        if not movie and title:
+            movies = self.get_movie(title=title)
+            if not movies:
+                return None
+            movie = movies[0]
+        if cinema and movie:  # times for a particular movie at a particular cinema
+            query = f"{self.baseUrl}/showtimes?lang={self.language}&cinema_id={cinema.id}&movie_id={movie.id}"
         elif cinema:  # times for all movies at a particular cinema
             query = f"{self.baseUrl}/showtimes?lang={self.language}&cinema_id={cinema.id}&append=movies"
-        elif movie or title:  # times for a particular movie at all cinemas
-            if not movie:
-                movie = self.get_movie(title=title)
-                if movie:
-                    query = f"{self.baseUrl}/showtimes?lang={self.language}&append=cinemas&movie_id={movie[0].id}"
-                    if latitude and longitude:
-                        query += f"&location={latitude},{longitude}"
+        elif movie:  # times for a particular movie at all cinemas
+            query = f"{self.baseUrl}/showtimes?lang={self.language}&append=cinemas&movie_id={movie.id}"
+            if latitude and longitude:
+                query += f"&location={latitude},{longitude}"
+        if not append:
+            query = query.replace('&append=cinemas', '').replace('&append=movies', '')
         if startDay:
             startDay = _get_midnight(_convert_to_datetime(startDay))
-            query += f"{query}&time_from={startDay}"
+            query += f"&time_from={startDay}"
         if endDay:
             endDay = _get_midnight(_convert_to_datetime(endDay))
-            query += f"{query}&time_to={endDay}"
-        res = _get_request(url=query, headers=self.headers)
-        if res and res.json().get('showtimes'):
-            for showtime_data in res.json()['showtimes']:
-                cached_showtime = self.cache.check_for_cached_showtime(showtime_id=showtime_data['id'])
-                if cached_showtime:
-                    results.append(cached_showtime)
+            query += f"&time_to={endDay}"
+        return query
+
+    def iter_showtimes(self, movie: Movie = None, title: str = None, cinema: Cinema = None, latitude: str = None,
+                       longitude: str = None, startDay: str = None, endDay: str = None, skip_cinemas: bool = False,
+                       batch_size: int = 500, fields=None):
+        """
+        Stream showtimes, yielding them while the response is still downloading
+
+        The body is parsed incrementally, and the streamed showtimes are not added to Cache.showtimes, so memory
+        stays flat however many showtimes match. Movies and cinemas are not appended to the response; they are
+        attached from the cache, or fetched and cached in one batch per batch_size showtimes, unless skip_cinemas
+        is set.
+
+        :param movie:
+        :param title:
+        :param cinema:
+        :param latitude:
+        :param longitude:
+        :param startDay:
+        :param endDay:
+        :param skip_cinemas:
+        :param batch_size:
+        :param fields: projection for the attached movies and cinemas, as in get_showtimes
+        :return: generator of Showtime
+        """
+        query = self._showtimes_query(movie=movie, title=title, cinema=cinema, latitude=latitude, longitude=longitude,
+                                      startDay=startDay, endDay=endDay, append=False)
+        if not query:
+            return
+        batch = []
+        for showtime_data in self._iter_array(query, 'showtimes'):
+            cached_showtime = self.cache.check_for_cached_showtime(showtime_id=showtime_data['id'])
+            batch.append(cached_showtime if cached_showtime else
+                         Showtime(showtime_data, self, skip_additional_api_calls=True))
+            if len(batch) >= batch_size:
+                if not skip_cinemas:
+                    self._hydrate_showtimes(batch, fields=fields)
+                yield from batch
+                batch = []
+        if batch and not skip_cinemas:
+            self._hydrate_showtimes(batch, fields=fields)
+        yield from batch
+
+    def sync_showtimes(self, movie: Movie = None, title: str = None, cinema: Cinema = None, latitude: str = None,
+                       longitude: str = None, startDay: str = None, endDay: str = None, skip_cinemas: bool = False,
+                       full: bool = False, full_interval: float = _FULL_SYNC_INTERVAL):
+        """
+        Bring the showtimes of a query up to date, fetching only what changed since its last sync
+
+        The first sync of a query, and one every full_interval seconds, is a full snapshot: showtimes no longer
+        listed are removed. Syncs in between ask only for records updated since the last one (updated_at_from)
+        and rebuild only records whose updated_at, or content, differs from what is held. Showtimes that have
+        already started are dropped from the result and from Cache.showtimes on every sync.
+
+        :param movie:
+        :param title:
+        :param cinema:
+        :param latitude:
+        :param longitude:
+        :param startDay:
+        :param endDay:
+        :param skip_cinemas:
+        :param full: force a full snapshot
+        :param full_interval: seconds after which a sync is a full snapshot again
+        :return: SyncResult
+        """
+        query = self._showtimes_query(movie=movie, title=title, cinema=cinema, latitude=latitude, longitude=longitude,
+                                      startDay=startDay, endDay=endDay, append=False)
+        if not query:
+            return SyncResult(added=0, changed=0, removed=0, showtimes=[])
+        key = normalize_url(query)
+        now = time.time()
+        with self._sync_lock:
+            state = self._syncs.setdefault(key, {'synced_at': None, 'full_at': None, 'showtimes': {}})
+        full = full or state['full_at'] is None or now - state['full_at'] >= full_interval
+        if not startDay:  # past showtimes are dropped anyway, don't download them
+            query += f"&time_from={now}"
+        if not full:
+            query += f"&updated_at_from={state['synced_at']}"
+        envelope = self._get_all_pages(query, 'showtimes')
+        if envelope is None:
+            return SyncResult(added=0, changed=0, removed=0, showtimes=self._synced_showtimes(state))
+        added, changed, removed = [], [], 0
+        with self._sync_lock:
+            tracked = state['showtimes']
+            listed = set()
+            for showtime_data in envelope.get('showtimes') or []:
+                showtime_id = showtime_data['id']
+                listed.add(showtime_id)
+                start = _parse_timestamp(showtime_data.get('start_at'))
+                if start is not None and start < now:
+                    continue
+                fingerprint = _fingerprint(showtime_data)
+                previous = tracked.get(showtime_id)
+                if previous and previous[0] == fingerprint:
+                    continue
+                showtime = Showtime(showtime_data, self, skip_additional_api_calls=True)
+                if previous and previous[1].movieId == showtime.movieId:
+                    showtime.movie = previous[1].movie
+                if previous and previous[1].cinemaId == showtime.cinemaId:
+                    showtime.cinema = previous[1].cinema
+                self.cache.showtimes.put(showtime_id, showtime, showtime_data)
+                tracked[showtime_id] = (fingerprint, showtime)
+                (changed if previous else added).append(showtime)
+            for showtime_id, (_, showtime) in list(tracked.items()):
+                gone = full and showtime_id not in listed
+                started = showtime.startTimestamp is not None and showtime.startTimestamp < now
+                if gone or started:
+                    del tracked[showtime_id]
+                    self.cache.showtimes.pop(showtime_id)
+                    removed += 1
+                elif showtime_id not in self.cache.showtimes:  # unchanged, but expired from the cache meanwhile
+                    self.cache.showtimes.put(showtime_id, showtime)
+            state['synced_at'] = now
+            if full:
+                state['full_at'] = now
+        if not skip_cinemas:
+            self._hydrate_showtimes(added + changed)
+        return SyncResult(added=len(added), changed=len(changed), removed=removed,
+                          showtimes=self._synced_showtimes(state))
+
+    def _synced_showtimes(self, state):
+        with self._sync_lock:
+            showtimes = [showtime for _, showtime in state['showtimes'].values()]
+        return sorted(showtimes, key=lambda showtime: (showtime.startTimestamp is None, showtime.startTimestamp or 0))
+
+    def _table(self, url: str, key: str, spec: dict, keep=None, keep_fields: tuple = ()):
+        # ask only for the fields the columns (and the keep filter) read, and stream the records into the builders
+        fields = tuple(dict.fromkeys((*(field for _, field, _ in spec.values()), *keep_fields)))
+        records = self._iter_array(f"{url}&fields={','.join(fields)}", key)
+        if keep:
+            records = filter(keep, records)
+        return ColumnTable.from_records(records, spec)
+
+    def showtimes_table(self, movie: Movie = None, title: str = None, cinema: Cinema = None, latitude: str = None,
+                        longitude: str = None, startDay: str = None, endDay: str = None, spec: dict = None):
+        """
+        Showtimes as columns, decoded from the streamed response without building a Showtime per row
+
+        :param movie:
+        :param title:
+        :param cinema:
+        :param latitude:
+        :param longitude:
+        :param startDay:
+        :param endDay:
+        :param spec: columns to build, defaults to SHOWTIME_COLUMNS
+        :return: ColumnTable
+        """
+        spec = (spec if spec else SHOWTIME_COLUMNS)
+        query = self._showtimes_query(movie=movie, title=title, cinema=cinema, latitude=latitude, longitude=longitude,
+                                      startDay=startDay, endDay=endDay, append=False)
+        if not query:
+            return ColumnTable.from_records([], spec)
+        return self._table(query, 'showtimes', spec)
+
+    def cinemas_table(self, name: str = None, city: str = None, zip_code: int = None, state: str = None,
+                      latitude: str = None, longitude: str = None, country_codes: list = None, spec: dict = None):
+        """
+        Cinemas as columns; filters work as in get_cinemas
+
+        :param name:
+        :param city:
+        :param zip_code:
+        :param state:
+        :param latitude:
+        :param longitude:
+        :param country_codes:
+        :param spec: columns to build, defaults to CINEMA_COLUMNS
+        :return: ColumnTable
+        """
+        spec = (spec if spec else CINEMA_COLUMNS)
+        query = self._plan_cinema_query(name=name, city=city, latitude=latitude, longitude=longitude,
+                                        country_codes=country_codes)
+        if not (name or city or zip_code or state):
+            return self._table(query, 'cinemas', spec)
+        return self._table(query, 'cinemas', spec, keep_fields=('name', 'location'),
+                           keep=partial(_cinema_matches, name=name, city=city, zip_code=zip_code, state=state))
+
+    def movies_table(self, cinema_id: str = None, spec: dict = None):
+        """
+        Current movies as columns
+
+        :param cinema_id:
+        :param spec: columns to build, defaults to MOVIE_COLUMNS
+        :return: ColumnTable
+        """
+        spec = (spec if spec else MOVIE_COLUMNS)
+        query = f'{self.baseUrl}/movies?lang={self.language}'
+        if cinema_id:
+            query += f'&cinema_id={cinema_id}'
+        return self._table(query, 'movies', spec)
+
+    def iter_cinemas(self, name: str = None, city: str = None, zip_code: int = None, state: str = None,
+                     latitude: str = None, longitude: str = None, country_codes: list = None, fields=None):
+        """
+        Stream cinemas matching the filters, yielding them while the response is still downloading
+
+        Cinemas already cached are yielded from the cache; the others are not added to it, so memory stays flat.
+
+        :param name:
+        :param city:
+        :param zip_code:
+        :param state:
+        :param latitude:
+        :param longitude:
+        :param country_codes:
+        :param fields: preset name from FIELD_PRESETS or a list of API fields
+        :return: generator of Cinema
+        """
+        fields = _resolve_fields('cinemas', fields)
+        query = self._plan_cinema_query(name=name, city=city, latitude=latitude, longitude=longitude,
+                                        country_codes=country_codes, fields=fields)
+        for cinema_data in self._iter_array(query, 'cinemas'):
+            if _cinema_matches(cinema_data, name=name, city=city, zip_code=zip_code, state=state):
+                cinema_data = _project(cinema_data, fields)
+                cached_cinema = self.cache.check_for_cached_cinema(cinema_id=cinema_data['id'])
+                yield (cached_cinema if cached_cinema and _covers(cached_cinema, cinema_data) else
+                       Cinema(cinema_data, self))
+
+    def _iter_array(self, url, key: str):
+        # pages are streamed one after another; each page's meta_info, read along with the records, tells whether
+        # another one follows. Without one, a page shorter than per_page is the last
+        page = 1
+        while page <= _MAX_PAGES:
+            res = self._get(f'{url}&page={page}&per_page={self.per_page}', stream=True)
+            if not res:
+                if page == 1:
+                    return
+                # the records already yielded would otherwise pass for the whole list
+                raise Exception(f"Failed to fetch page {page} of {url}, the list is incomplete.")
+            captured = {'meta_info': None}
+            received = 0
+            try:
+                for item in _iter_json_array(res.iter_content(chunk_size=_STREAM_CHUNK_SIZE), key, captured):
+                    received += 1
+                    yield item
+            finally:
+                res.close()
+            meta = captured['meta_info'] or {}
+            total = _meta_int(meta, 'total_count', 'total')
+            per_page = _meta_int(meta, 'per_page') or self.per_page
+            if not received or (page * per_page >= total if total is not None else received < per_page):
+                return
+            page += 1
+        logger.warning(f"Stopped streaming {url} after {_MAX_PAGES} pages")
+
+    def _cache_chain(self, chain_data):
+        cached_chain = self.cache.check_for_cached_chain(chain_id=chain_data['id'])
+        if cached_chain:
+            return cached_chain
+        return self.cache.chains.setdefault(chain_data['id'], Chain(chain_data, self), chain_data)
+
+    def _cache_showtime(self, showtime_data, movie: Movie = None, cinema: Cinema = None):
+        cached_showtime = self.cache.check_for_cached_showtime(showtime_id=showtime_data['id'])
+        if cached_showtime:
+            return cached_showtime
+        new_showtime = Showtime(showtime_data, self, movie=movie, cinema=cinema, skip_additional_api_calls=True)
+        return self.cache.showtimes.setdefault(showtime_data['id'], new_showtime, showtime_data)
+
+    def _cache_movie(self, movie_data):
+        cached_movie = self.cache.check_for_cached_movie(movie_id=movie_data['id'])
+        if cached_movie:
+            if _covers(cached_movie, movie_data):
+                return cached_movie
+            # the cached movie came from a narrower projection, replace it
+            new_movie = Movie(movie_data, self)
+            self.cache.movies.put(movie_data['id'], new_movie, movie_data)
+            return new_movie
+        return self.cache.movies.setdefault(movie_data['id'], Movie(movie_data, self), movie_data)
+
+    def _cache_cinema(self, cinema_data):
+        cached_cinema = self.cache.check_for_cached_cinema(cinema_id=cinema_data['id'])
+        if cached_cinema:
+            if _covers(cached_cinema, cinema_data):
+                return cached_cinema
+            new_cinema = Cinema(cinema_data, self)
+            self.cache.cinemas.put(cinema_data['id'], new_cinema, cinema_data)
+            return new_cinema
+        return self.cache.cinemas.setdefault(cinema_data['id'], Cinema(cinema_data, self), cinema_data)
+
+    def _complete(self, model, name: str):
+        """
+        Replace a projected model's payload with the full one, the first time a field it lacks is read
+
+        Other projected models of the same type held in the cache are completed in the same request, so reading
+        a left-out field across a projected list costs one request per _IDS_PER_REQUEST models. Models are
+        updated in place, so everything already holding them sees the new fields.
+
+        :param model: Movie or Cinema built from a projection
+        :param name: attribute being read
+        :return: the attribute's value
+        """
+        store = getattr(self.cache, ('movies' if isinstance(model, Movie) else 'cinemas'))
+        others = [other for other in store.values() if other is not model and other._fields is not None]
+        self.complete([model] + others[:_IDS_PER_REQUEST - 1])
+        if model._fields is not None:
+            raise AttributeError(name)
+        return getattr(model, name)
+
+    def complete(self, models: list):
+        """
+        Fetch the full payload of projected movies and cinemas in batches of _IDS_PER_REQUEST, updating them in
+        place; models that are already complete are left alone
+
+        :param models: [Movie or Cinema, ...], e.g. from get_all_current_movies(fields='minimal')
+        """
+        for entity, model_type in (('movies', Movie), ('cinemas', Cinema)):
+            projected = {}
+            for model in models:
+                if isinstance(model, model_type) and model._fields is not None:
+                    projected.setdefault(str(model.id), []).append(model)
+            if not projected:
+                continue
+            store = getattr(self.cache, entity)
+            for item_data in self._get_by_ids(entity, list(projected)):
+                for model in projected.get(str(item_data['id']), []):
+                    model.__init__(item_data, self)
+                    store.put(model.id, model, item_data)
+
+    def _get_by_ids(self, endpoint: str, ids: list, fields: tuple = None, language: str = None):
+        """
+        Fetch several movies or cinemas in as few requests as possible
+
+        :param endpoint: 'movies' or 'cinemas'
+        :param ids:
+        :param fields: resolved projection; the payloads come back tagged with it
+        :param language: defaults to the client's
+        :return: [dict, ...]
+        """
+        results = []
+        ids = list(ids)
+        language = (language if language else self.language)
+        for i in range(0, len(ids), _IDS_PER_REQUEST):
+            query = f"{self.baseUrl}/{endpoint}?lang={language}&ids={','.join(ids[i:i + _IDS_PER_REQUEST])}"
+            data = self._get_json(query + _fields_param(fields))
+            if data and data.get(endpoint):
+                results.extend(_project(item_data, fields) for item_data in data[endpoint])
+        return results
+
+    def localize(self, models: list, languages: list):
+        """
+        The same movies or genres in several languages, fetching only their LOCALIZED_FIELDS
+
+        Shared fields are read from the models themselves, so each extra language costs a few fields per
+        model. Deltas already in Cache.localized are reused; the rest is fetched for every language in
+        parallel, movies in batches by id and genres as one list per language.
+
+        :param models: [Movie, ...] or [Genre, ...], e.g. from get_all_current_movies()
+        :param languages: language codes, e.g. ['de', 'fr']; the client's own language returns the models as they are
+        :return: {language: [Localized, ...] in the order of models, ...}; a model the API has no translation
+        for reads entirely from the model
+        """
+        models = list(models)
+        if not models:
+            return {language: [] for language in languages}
+        entity = ('genres' if isinstance(models[0], Genre) else 'movies')
+        ids = list(dict.fromkeys(model.id for model in models))
+        payloads = self._get_localized(entity, ids, [language for language in languages
+                                                     if language != self.language])
+        return {language: (list(models) if language == self.language else
+                           [Localized(model, language, payloads[language].get(model.id, {})) for model in models])
+                for language in languages}
+
+    def _get_localized(self, entity: str, ids: list, languages: list):
+        """
+
+        :param entity: 'movies' or 'genres'
+        :param ids:
+        :param languages:
+        :return: {language: {id: payload}}
+        """
+        results = {language: {} for language in languages}
+        missing = {}
+        for language in languages:
+            for item_id in ids:
+                payload = self.cache.localized.get((entity, item_id, language))
+                if payload is None:
+                    missing.setdefault(language, []).append(item_id)
                 else:
-                    new_showtime = Showtime(showtime_data, self, skip_additional_api_calls=skip_cinemas)
-                    self.cache.showtimes[showtime_data['id']] = new_showtime
-                    results.append(new_showtime)
+                    results[language][item_id] = payload
+        if entity == 'genres':  # one small list holds every genre
+            tasks = [(language, None) for language in missing]
+        else:
+            tasks = [(language, item_ids[i:i + _IDS_PER_REQUEST]) for language, item_ids in missing.items()
+                     for i in range(0, len(item_ids), _IDS_PER_REQUEST)]
+        if not tasks:
+            return results
+
+        def fetch(language, item_ids):
+            if item_ids is None:
+                data = self._get_json(f'{self.baseUrl}/genres?lang={language}')
+                return ((data.get('genres') or []) if data else [])
+            return self._get_by_ids(entity, item_ids, fields=('id', *LOCALIZED_FIELDS[entity]), language=language)
+
+        pool = ThreadPoolExecutor(max_workers=max(1, min(self.page_workers, len(tasks))))
+        try:
+            futures = [(language, pool.submit(fetch, language, item_ids)) for language, item_ids in tasks]
+            for language, future in futures:
+                for item_data in future.result():
+                    payload = {field: item_data[field] for field in LOCALIZED_FIELDS[entity] if field in item_data}
+                    self.cache.localized.put((entity, item_data['id'], language), payload)
+                    results[language][item_data['id']] = payload
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
         return results
 
+    def _hydrate_showtimes(self, showtimes: list, fields=None):
+        """
+        Attach a Movie and Cinema to every showtime that is missing one, using the cache first
+        and fetching whatever is still missing in one batched pass
+
+        :param showtimes: [Showtime, ...]
+        :param fields: projection for the fetched movies and cinemas, a preset name or {'movies': ..., 'cinemas': ...}
+        """
+        if not isinstance(fields, dict):
+            fields = {'movies': fields, 'cinemas': fields}
+        missing_movies = {showtime.movieId for showtime in showtimes if showtime.movieId and not showtime.movie
+                          and not self.cache.check_for_cached_movie(movie_id=showtime.movieId)}
+        missing_cinemas = {showtime.cinemaId for showtime in showtimes if showtime.cinemaId and not showtime.cinema
+                           and not self.cache.check_for_cached_cinema(cinema_id=showtime.cinemaId)}
+        for movie_data in self._get_by_ids('movies', sorted(missing_movies),
+                                           fields=_resolve_fields('movies', fields.get('movies'))):
+            self._cache_movie(movie_data)
+        for cinema_data in self._get_by_ids('cinemas', sorted(missing_cinemas),
+                                            fields=_resolve_fields('cinemas', fields.get('cinemas'))):
+            self._cache_cinema(cinema_data)
+        for showtime in showtimes:
+            if showtime.movieId and not showtime.movie:
+                showtime.movie = self.cache.check_for_cached_movie(movie_id=showtime.movieId)
+            if showtime.cinemaId and not showtime.cinema:
+                showtime.cinema = self.cache.check_for_cached_cinema(cinema_id=showtime.cinemaId)
+
     def get_chain(self, chain_name: str = None, chain_id: str = None, country_codes: list = []):
         """
 
@@ -537,20 +3536,23 @@ class InternationalShowtimes:
         cached_chain = self.cache.check_for_cached_chain(chain_id=chain_id, chain_name=chain_name)
         if cached_chain:
             return [cached_chain]
+        # a miss within some countries says nothing about the others
+        scope = ('chains:' + ','.join(country_codes) if country_codes else 'chains')
+        if self.cache.is_missing(scope, id=chain_id, name=chain_name):
+            return []
         query = f'{self.baseUrl}/chains?lang={self.language}'
         if country_codes:
             query += f"&countries={','.join(country_codes)}"
-        res = _get_request(url=query,
-                           headers=self.headers)
-        if res and res.json().get('chains'):
-            for chain_data in res.json()['chains']:
+        data = self._get_all_pages(query, 'chains')
+        if data and data.get('chains'):
+            for chain_data in data['chains']:
                 cached_chain = self.cache.check_for_cached_chain(chain_id=chain_data['id'],
                                                                  chain_name=chain_data['name'])
                 if cached_chain:
                     results.append(cached_chain)
                 else:
                     new_chain = Chain(chain_data, self)
-                    self.cache.chains[chain_data['id']] = new_chain
+                    self.cache.chains.put(chain_data['id'], new_chain, chain_data)
                     results.append(new_chain)
         if chain_name or chain_id:
             filtered = []
@@ -559,11 +3561,302 @@ class InternationalShowtimes:
                         chain_id and chain_id.strip() == chain.id.strip()):
                     filtered.append(chain)
             results = filtered
+            if not results and data is not None:
+                self.cache.add_missing(scope, id=chain_id, name=chain_name)
+        return results
+
+    def _refresh_cached(self, entity: str, keys: list):
+        """
+        Re-fetch stale cache entries; called from a CacheStore's refresh worker
+
+        :param entity: 'movies', 'cinemas', 'chains' or 'genres'
+        :param keys: ids of the stale entries
+        """
+        if entity in ('movies', 'cinemas'):
+            self._refresh_cached_batch(entity, keys)
+        elif entity in ('chains', 'genres'):  # one list request refreshes every entry
+            model = (Chain if entity == 'chains' else Genre)
+            data = self._get_all_pages(f'{self.baseUrl}/{entity}?lang={self.language}', entity)
+            if data and data.get(entity):
+                store = getattr(self.cache, entity)
+                for item_data in data[entity]:
+                    store.put(item_data['id'], model(item_data, self), item_data)
+
+    def _refresh_cached_batch(self, entity: str, ids: list):
+        """
+        Re-fetch several movies or cinemas in as few requests as possible and store them
+
+        :param entity: 'movies' or 'cinemas'
+        :param ids:
+        """
+        model = (Movie if entity == 'movies' else Cinema)
+        store = getattr(self.cache, entity)
+        for item_data in self._get_by_ids(entity, ids):
+            store.put(item_data['id'], model(item_data, self), item_data)
+
+    def cache_stats(self):
+        """
+
+        :return: {entity: {'size': ..., 'hits': ..., 'misses': ..., ...}, ...}
+        """
+        return self.cache.stats()
+
+    def decode_timings(self):
+        """
+
+        :return: {endpoint: {'count': ..., 'seconds': ..., 'bytes': ..., 'mean_ms': ...}, ...}
+        """
+        return self.decode_stats.snapshot()
+
+    def clear_cache(self, persistent: bool = False):
+        self.cache.clear(persistent=persistent)
+        if hasattr(self.transport, 'clear'):
+            self.transport.clear()
+
+    def metrics_snapshot(self):
+        """
+
+        :return: {'requests': Metrics.snapshot() or {} without metrics, 'cache': {entity: {..., 'hit_ratio': ...}}}
+        """
+        cache = {}
+        for entity, stats in self.cache.stats().items():
+            lookups = stats['hits'] + stats['misses']
+            cache[entity] = {**stats, 'hit_ratio': (stats['hits'] / lookups if lookups else None)}
+        return {'requests': (self.metrics.snapshot() if self.metrics else {}), 'cache': cache}
+
+    def metrics_text(self):
+        """
+
+        :return: request and cache metrics in the Prometheus text exposition format
+        """
+        return (self.metrics if self.metrics else Metrics()).prometheus_text(cache_stats=self.cache.stats())
+
+    def serve_metrics(self, port: int = 9464, host: str = '127.0.0.1'):
+        """
+        Serve metrics_text() for Prometheus to scrape, from a daemon thread
+
+        :param port:
+        :param host:
+        :return: the http.server.ThreadingHTTPServer; call shutdown() on it to stop
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        client = self
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = client.metrics_text().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+class AsyncInternationalShowtimes:
+    """
+    asyncio front end to InternationalShowtimes
+
+    Requests run on the pooled HTTPTransport in a bounded worker pool, so the event loop never blocks on I/O
+    and fan-out is capped at max_concurrency. Every upstream request, including retries and the
+    movie/cinema hydration behind get_showtimes, goes through one shared RateLimiter.
+    """
+
+    def __init__(self, api_key: str, language: str = None, transport=None, cache_policies: dict = None,
+                 max_concurrency: int = 10, requests_per_second: float = None, lazy: bool = True,
+                 keep_raw: bool = True, metrics: Metrics = None, base_url: str = None):
+        """
+
+        :param api_key:
+        :param language:
+        :param transport: HTTPTransport, or any object with the same get() signature
+        :param cache_policies: {entity: CachePolicy}
+        :param lazy: see InternationalShowtimes; on by default, so that constructing the client inside a coroutine
+        doesn't download the current movies on the event loop's thread; await warm_up() to preload them
+        :param keep_raw: see InternationalShowtimes
+        :param max_concurrency: calls allowed in flight at once
+        :param requests_per_second: global upstream request budget, unlimited if None
+        :param metrics: see InternationalShowtimes
+        :param base_url: see InternationalShowtimes
+        """
+        transport = (transport if transport else HTTPTransport(pool_maxsize=max_concurrency))
+        self.client = InternationalShowtimes(api_key=api_key, language=language, transport=transport,
+                                             cache_policies=cache_policies, lazy=lazy, keep_raw=keep_raw,
+                                             requests_per_second=requests_per_second, metrics=metrics,
+                                             base_url=base_url)
+        self.rate_limiter = self.client.rate_limiter
+        self.cache = self.client.cache
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='showtimes')
+
+    async def _run(self, function, *args, **kwargs):
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(function, *args, **kwargs))
+
+    async def warm_up(self):
+        return await self._run(self.client.warm_up)
+
+    async def get_genre(self, genre_id: str = None, genre_name: str = None):
+        return await self._run(self.client.get_genre, genre_id=genre_id, genre_name=genre_name)
+
+    async def get_all_current_movies(self, cinema_id: str = None, fields=None):
+        return await self._run(self.client.get_all_current_movies, cinema_id=cinema_id, fields=fields)
+
+    async def get_upcoming_movies(self, fields=None):
+        return await self._run(self.client.get_upcoming_movies, fields=fields)
+
+    async def get_movie(self, title: str = None, movie_id: str = None, fields=None):
+        return await self._run(self.client.get_movie, title=title, movie_id=movie_id, fields=fields)
+
+    async def get_cinemas(self, **kwargs):
+        return await self._run(self.client.get_cinemas, **kwargs)
+
+    async def get_showtimes(self, **kwargs):
+        return await self._run(self.client.get_showtimes, **kwargs)
+
+    async def sync_showtimes(self, **kwargs):
+        return await self._run(self.client.sync_showtimes, **kwargs)
+
+    async def localize(self, models: list, languages: list):
+        return await self._run(self.client.localize, models, languages)
+
+    async def get_chain(self, chain_name: str = None, chain_id: str = None, country_codes: list = None):
+        return await self._run(self.client.get_chain, chain_name=chain_name, chain_id=chain_id,
+                               country_codes=(country_codes if country_codes else []))
+
+    async def _gather(self, keys, function):
+        results = await asyncio.gather(*(function(key) for key in keys))
+        return dict(zip(keys, results))
+
+    async def _gather_showtimes(self, keys, function, skip_cinemas: bool = False, fields=None):
+        # hydrate once across the whole fan-out so missing movies/cinemas are batched together
+        results = await self._gather(keys, function)
+        if not skip_cinemas:
+            await self._run(self.client._hydrate_showtimes,
+                            [showtime for showtimes in results.values() for showtime in showtimes], fields=fields)
         return results
 
+    async def get_showtimes_for_cinemas(self, cinemas: list, skip_cinemas: bool = False, fields=None, **kwargs):
+        """
+        Fetch showtimes for many cinemas concurrently
+
+        :param cinemas: [Cinema or cinema_id, ...]
+        :param skip_cinemas:
+        :param fields: projection for the attached movies and cinemas, as in InternationalShowtimes.get_showtimes
+        :param kwargs: passed to get_showtimes
+        :return: {cinema_id: [Showtime, ...], ...}
+        """
+        cinemas = {(cinema if isinstance(cinema, str) else cinema.id): cinema for cinema in cinemas}
+
+        async def _fetch(cinema_id):
+            cinema = cinemas[cinema_id]
+            if isinstance(cinema, str):
+                cinema = Cinema({'id': cinema}, self.client)
+            return await self.get_showtimes(cinema=cinema, skip_cinemas=True, fields=fields, **kwargs)
+
+        return await self._gather_showtimes(list(cinemas), _fetch, skip_cinemas=skip_cinemas, fields=fields)
+
+    async def get_showtimes_for_movies(self, movies: list, skip_cinemas: bool = False, fields=None, **kwargs):
+        """
+        Fetch showtimes for many movies concurrently
+
+        :param movies: [Movie, ...]
+        :param skip_cinemas:
+        :param fields: projection for the attached movies and cinemas, as in InternationalShowtimes.get_showtimes
+        :param kwargs: passed to get_showtimes
+        :return: {movie_id: [Showtime, ...], ...}
+        """
+        movies = {movie.id: movie for movie in movies}
+        return await self._gather_showtimes(
+            list(movies),
+            lambda movie_id: self.get_showtimes(movie=movies[movie_id], skip_cinemas=True, fields=fields, **kwargs),
+            skip_cinemas=skip_cinemas, fields=fields)
+
+    def _fetch_ids(self, entity: str, ids: list):
+        # one ids= request; ids the API answers without are remembered as missing
+        client = self.client
+        data = client._get_json(f"{client.baseUrl}/{entity}?lang={client.language}&ids={','.join(ids)}")
+        if data is None:
+            return {}
+        build = (client._cache_movie if entity == 'movies' else client._cache_cinema)
+        found = {str(item_data['id']): [build(item_data)] for item_data in data.get(entity) or []}
+        for key in ids:
+            if key not in found:
+                client.cache.add_missing(entity, id=key)
+        return found
+
+    async def _gather_ids(self, entity: str, ids: list):
+        """
+        Answer cached ids from the cache, then fetch the rest _IDS_PER_REQUEST per request, the requests concurrently
+
+        :return: {id: [Movie or Cinema] or [], ...}
+        """
+        cache = self.client.cache
+        ids = list(dict.fromkeys(str(key) for key in ids))
+        results, wanted = {}, []
+        for key in ids:
+            if self.client.scheduler:
+                self.client.scheduler.touch(entity, key)
+            cached = (cache.check_for_cached_movie(movie_id=key) if entity == 'movies' else
+                      cache.check_for_cached_cinema(cinema_id=key))
+            if cached:
+                results[key] = [cached]
+            elif cache.is_missing(entity, id=key):
+                results[key] = []
+            else:
+                wanted.append(key)
+        chunks = [wanted[i:i + _IDS_PER_REQUEST] for i in range(0, len(wanted), _IDS_PER_REQUEST)]
+        for found in await asyncio.gather(*(self._run(self._fetch_ids, entity, chunk) for chunk in chunks)):
+            results.update(found)
+        return {key: results.get(key, []) for key in ids}
+
+    async def get_movies(self, movie_ids: list):
+        """
+        Several movies by id: cached ones are answered first, the rest are fetched _IDS_PER_REQUEST per request
+
+        :param movie_ids:
+        :return: {movie_id: [Movie] or [], ...}
+        """
+        return await self._gather_ids('movies', list(movie_ids))
+
+    async def get_cinemas_by_ids(self, cinema_ids: list):
+        """
+        Several cinemas by id: cached ones are answered first, the rest are fetched _IDS_PER_REQUEST per request
+
+        :param cinema_ids:
+        :return: {cinema_id: [Cinema] or [], ...}
+        """
+        return await self._gather_ids('cinemas', list(cinema_ids))
+
+    def cache_stats(self):
+        return self.client.cache_stats()
+
+    def metrics_snapshot(self):
+        return self.client.metrics_snapshot()
+
+    def start_scheduler(self, **options):
+        return self.client.start_scheduler(**options)
+
+    def stop_scheduler(self):
+        self.client.stop_scheduler()
+
     def clear_cache(self):
-        self.cache.movies.clear()
-        self.cache.cinemas.clear()
-        self.cache.showtimes.clear()
-        self.cache.chains.clear()
-        self.cache.genres.clear()
+        self.client.clear_cache()
+
+    async def close(self):
+        self._executor.shutdown(wait=False)
+        self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -0,0 +1,248 @@
+#!/usr/bin/python3
+"""
+Local caching proxy for the International Showtimes API, shared by many client processes
+
+    python showtimes_proxy.py --api-key KEY --port 8765
+
+then point clients at it with InternationalShowtimes(api_key=..., base_url='http://127.0.0.1:8765').
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import requests
+
+import international_showtimes_api as isa
+
+logger = logging.getLogger(__name__)
+
+
+_MB = 1024 * 1024
+
+PROXY_CACHE_POLICIES = {
+    'movies': isa.CachePolicy(maxsize=2000, ttl=6 * 60 * 60, stale_ttl=60 * 60, max_bytes=64 * _MB),
+    'cinemas': isa.CachePolicy(maxsize=2000, ttl=24 * 60 * 60, stale_ttl=6 * 60 * 60, max_bytes=64 * _MB),
+    'showtimes': isa.CachePolicy(maxsize=5000, ttl=10 * 60, stale_ttl=0, max_bytes=256 * _MB),
+    'chains': isa.CachePolicy(maxsize=200, ttl=7 * 24 * 60 * 60, stale_ttl=24 * 60 * 60, max_bytes=16 * _MB),
+    'genres': isa.CachePolicy(maxsize=100, ttl=7 * 24 * 60 * 60, stale_ttl=24 * 60 * 60, max_bytes=4 * _MB),
+    'cities': isa.CachePolicy(maxsize=1000, ttl=7 * 24 * 60 * 60, stale_ttl=24 * 60 * 60, max_bytes=16 * _MB),
+}
+"""
+Response cache of a ShowtimesProxy, per route; maxsize counts responses (one url each), not models, and
+max_bytes bounds their bodies together; a body larger than max_bytes is served but not cached
+"""
+
+
+def _entry_size(entry):
+    # (status, content_type, body, etag)
+    return len(entry[2])
+
+
+class ShowtimesProxy:
+    """
+    Local HTTP service in front of the API, so many processes share one cache and one request budget
+
+    Serves the /movies, /cinemas, /showtimes, /chains, /genres and /cities routes, with or without the
+    upstream /v4 prefix. Response bodies are cached per normalized url, identical concurrent requests from
+    any number of clients become one upstream request, and every upstream request goes through one
+    RateLimiter. Responses carry an ETag, so clients with conditional_requests revalidate with a 304.
+    Point clients at it with InternationalShowtimes(api_key=..., base_url='http://127.0.0.1:8765').
+    """
+
+    def __init__(self, api_key: str, upstream: str = 'https://api.internationalshowtimes.com/v4', transport=None,
+                 requests_per_second: float = None, cache_policies: dict = None, conditional_requests: bool = True,
+                 metrics: isa.Metrics = None):
+        """
+
+        :param api_key: key every upstream request is made with; keys sent by clients are ignored
+        :param upstream: API root requests are forwarded to
+        :param transport: HTTPTransport, or any object with the same get() signature
+        :param requests_per_second: upstream request budget shared by every client, unlimited if None
+        :param cache_policies: {route: CachePolicy}, overriding PROXY_CACHE_POLICIES per route
+        :param conditional_requests: revalidate expired responses upstream, see ConditionalTransport
+        :param metrics: Metrics to record upstream requests into, served at /proxy/metrics
+        """
+        self.headers = {'x-api-key': api_key}
+        self.upstream = upstream.rstrip('/')
+        self.prefix = urlsplit(self.upstream).path
+        self.transport = (transport if transport else isa.HTTPTransport())
+        self.metrics = metrics
+        if self.metrics:
+            self.transport = isa.InstrumentedTransport(self.transport, self.metrics)
+        self.rate_limiter = (isa.RateLimiter(requests_per_second) if requests_per_second else None)
+        if self.rate_limiter:
+            self.transport = isa.RateLimitedTransport(self.transport, self.rate_limiter)
+        if conditional_requests:
+            self.transport = isa.ConditionalTransport(self.transport, maxsize=1024, max_bytes=128 * 1024 * 1024)
+        policies = {**PROXY_CACHE_POLICIES, **(cache_policies if cache_policies else {})}
+        self.stores = {route: isa.CacheStore(policy, refresh=self._refresh, sizeof=_entry_size)
+                       for route, policy in policies.items()}
+        self._flights = isa.SingleFlight()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.upstream_requests = 0
+        self.upstream_errors = 0
+
+    def _route(self, path: str):
+        if self.prefix and (path == self.prefix or path.startswith(self.prefix + '/')):
+            path = path[len(self.prefix):]
+        segments = path.strip('/').split('/')
+        if len(segments) > 2 or segments[0] not in self.stores:
+            return None, None
+        return segments[0], '/'.join(segments)
+
+    def _fetch(self, route: str, url: str):
+        """
+        Make the upstream request for a url and cache a successful response
+
+        :return: (status, content_type, body, etag)
+        """
+        with self._lock:
+            self.upstream_requests += 1
+        try:
+            res = self.transport.get(url, headers=self.headers)
+        except requests.exceptions.RequestException:
+            logger.error(f"Upstream request for {url} failed")
+            res = None
+        if res is None:
+            with self._lock:
+                self.upstream_errors += 1
+            return 502, 'application/json', json.dumps({'error': 'upstream request failed'}).encode(), None
+        content_type = getattr(res, 'headers', {}).get('Content-Type', 'application/json')
+        if not res:
+            return res.status_code, content_type, res.content, None
+        entry = (200, content_type, res.content, f'"{hashlib.sha1(res.content).hexdigest()}"')
+        self.stores[route].put(url, entry)
+        return entry
+
+    def _refresh(self, urls: list):
+        for url in urls:
+            route, _ = self._route(urlsplit(url).path)
+            self._flights.do(url, partial(self._fetch, route, url))
+
+    def handle(self, path: str, headers: dict = None):
+        """
+        Answer one GET request
+
+        :param path: request path with its query string, e.g. '/movies?lang=en'
+        :param headers: request headers; If-None-Match is honoured
+        :return: (status, {header: value}, body)
+        """
+        with self._lock:
+            self.requests += 1
+        parts = urlsplit(path)
+        if parts.path == '/proxy/stats':
+            return 200, {'Content-Type': 'application/json'}, json.dumps(self.stats()).encode()
+        if parts.path == '/proxy/metrics':
+            body = self.metrics_text().encode()
+            return 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}, body
+        route, resource = self._route(parts.path)
+        if route is None:
+            return 404, {'Content-Type': 'application/json'}, json.dumps({'error': 'unknown route'}).encode()
+        url = isa.normalize_url(f'{self.upstream}/{resource}?{parts.query}')
+        entry = self.stores[route].get(url)
+        cache_status = ('HIT' if entry is not None else 'MISS')
+        if entry is None:
+            entry = self._flights.do(url, partial(self._fetch, route, url))
+        status, content_type, body, etag = entry
+        response_headers = {'Content-Type': content_type, 'X-Cache': cache_status}
+        if etag:
+            response_headers['ETag'] = etag
+            if etag in ((headers if headers else {}).get('If-None-Match') or ''):
+                return 304, response_headers, b''
+        return status, response_headers, body
+
+    def stats(self):
+        """
+
+        :return: {'requests': ..., 'upstream_requests': ..., 'upstream_errors': ..., 'cache': {route: {...}}}
+        """
+        with self._lock:
+            stats = {'requests': self.requests, 'upstream_requests': self.upstream_requests,
+                     'upstream_errors': self.upstream_errors}
+        stats['cache'] = {route: store.stats() for route, store in self.stores.items()}
+        if hasattr(self.transport, 'stats'):
+            stats['conditional'] = self.transport.stats()
+        return stats
+
+    def metrics_text(self):
+        return (self.metrics if self.metrics else isa.Metrics()).prometheus_text(
+            cache_stats={route: store.stats() for route, store in self.stores.items()})
+
+    def clear(self):
+        for store in self.stores.values():
+            store.clear()
+        if hasattr(self.transport, 'clear'):
+            self.transport.clear()
+
+    def serve(self, port: int = 8765, host: str = '127.0.0.1', background: bool = False):
+        """
+        Serve the proxy over HTTP
+
+        :param port:
+        :param host:
+        :param background: serve from a daemon thread and return, instead of blocking
+        :return: the http.server.ThreadingHTTPServer; call shutdown() on it to stop
+        """
+        proxy = self
+
+        class _ProxyHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                try:
+                    status, headers, body = proxy.handle(self.path, dict(self.headers))
+                except Exception:
+                    logger.exception(f"Proxying {self.path} failed")
+                    status, headers, body = 500, {'Content-Type': 'application/json'}, b'{"error": "proxy error"}'
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        server = ThreadingHTTPServer((host, port), _ProxyHandler)
+        server.daemon_threads = True
+        if background:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        else:
+            try:
+                server.serve_forever()
+            finally:
+                server.server_close()
+                self.transport.close()
+        return server
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description='Local caching proxy for the International Showtimes API')
+    parser.add_argument('--api-key', default=os.environ.get('ISA_API_KEY'),
+                        help='upstream API key, defaults to $ISA_API_KEY')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--requests-per-second', type=float, default=None,
+                        help='upstream request budget shared by every client')
+    parser.add_argument('--upstream', default='https://api.internationalshowtimes.com/v4')
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error('an API key is required, via --api-key or $ISA_API_KEY')
+    logging.basicConfig(level=logging.INFO)
+    proxy = ShowtimesProxy(api_key=args.api_key, upstream=args.upstream,
+                           requests_per_second=args.requests_per_second, metrics=isa.Metrics())
+    logger.info(f"Proxying {proxy.upstream} on http://{args.host}:{args.port}")
+    proxy.serve(port=args.port, host=args.host)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+SQLiteCacheBackend shared by two connections, as two worker processes would share it
+"""
+
+import time
+
+import international_showtimes_api as isa
+
+
+def _pair(tmp_path, commit_interval=0.1):
+    path = str(tmp_path / 'cache.sqlite3')
+    return (isa.SQLiteCacheBackend(path, commit_interval=commit_interval),
+            isa.SQLiteCacheBackend(path, commit_interval=commit_interval))
+
+
+def test_rows_become_visible_after_an_idle_writer_commits(tmp_path):
+    writer, reader = _pair(tmp_path)
+    try:
+        writer.put('movies', '1', {'id': '1', 'title': 'Alien'})
+        time.sleep(0.3)  # no further writes
+        payload, age = reader.get('movies', '1')
+        assert payload['title'] == 'Alien' and age < 5
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_idle_writer_does_not_hold_the_write_lock(tmp_path):
+    first, second = _pair(tmp_path)
+    try:
+        first.put('movies', '1', {'id': '1'})
+        time.sleep(0.3)
+        started = time.monotonic()
+        second.put('movies', '2', {'id': '2'})
+        second.flush()
+        assert time.monotonic() - started < 1
+        assert first.get('movies', '2') is not None
+    finally:
+        first.close()
+        second.close()
+
+
+def test_batches_commit_at_commit_every(tmp_path):
+    writer, reader = _pair(tmp_path, commit_interval=60)
+    writer.commit_every = 3
+    try:
+        for key in range(3):
+            writer.put('movies', str(key), {'id': str(key)})
+        assert reader.count('movies') == 3
+    finally:
+        writer.close()
+        reader.close()
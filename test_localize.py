@@ -0,0 +1,90 @@
+"""
+localize() and Localized against a ReplayTransport that translates titles and genre names per lang
+"""
+
+import json
+from urllib.parse import parse_qsl, urlsplit
+
+import benchmark
+import international_showtimes_api as isa
+
+
+class _TranslatingTransport(benchmark.ReplayTransport):
+    def __init__(self):
+        super().__init__()
+        self.urls = []
+
+    def _body(self, url: str):
+        found = super()._body(url)
+        language = dict(parse_qsl(urlsplit(url).query)).get('lang', 'en')
+        if found is None or language == 'en':
+            return found
+        endpoint, body = found
+        envelope = json.loads(body)
+        for record in envelope[endpoint]:
+            for field in ('title', 'name'):
+                if field in record:
+                    record[field] = f'{record[field]} ({language})'
+            for genre in record.get('genres') or []:
+                genre['name'] = f"{genre['name']} ({language})"
+        return endpoint, json.dumps(envelope).encode()
+
+    def get(self, url, headers=None, payload: dict = None, stream: bool = False):
+        self.urls.append(url)
+        return super().get(url, headers=headers, payload=payload, stream=stream)
+
+
+def _client(transport, **options):
+    return isa.InternationalShowtimes(api_key='test', transport=transport, lazy=True, **options)
+
+
+def test_movies_in_several_languages():
+    transport = _TranslatingTransport()
+    client = _client(transport)
+    movies = client.get_all_current_movies()[:120]
+    transport.urls.clear()
+    localized = client.localize(movies, ['en', 'de', 'fr'])
+    assert localized['en'] == movies
+    german = localized['de']
+    assert [movie.title for movie in german[:2]] == ['Movie 0 (de)', 'Movie 1 (de)']
+    assert german[0].genres[0].name == 'Genre 0 (de)'
+    assert german[0].runtime == movies[0].runtime and german[0].id == movies[0].id  # shared, read from the model
+    assert localized['fr'][5].title == 'Movie 5 (fr)'
+    assert movies[0].title == 'Movie 0'
+    # two id batches per language, asking only for the localized fields
+    assert len(transport.urls) == 2 * -(-len(movies) // isa._IDS_PER_REQUEST)
+    fields = {dict(parse_qsl(urlsplit(url).query))['fields'] for url in transport.urls}
+    assert fields == {','.join(('id',) + isa.LOCALIZED_FIELDS['movies'])}
+    transport.urls.clear()
+    assert client.localize(movies, ['de'])['de'][7].title == 'Movie 7 (de)'
+    assert transport.urls == []  # reused from Cache.localized
+
+
+def test_genres_cost_one_list_per_language():
+    transport = _TranslatingTransport()
+    client = _client(transport)
+    genres = [client.get_genre(genre_id=str(genre_id))[0] for genre_id in range(3)]
+    transport.urls.clear()
+    localized = client.localize(genres, ['de', 'fr'])
+    assert [genre.name for genre in localized['de']] == ['Genre 0 (de)', 'Genre 1 (de)', 'Genre 2 (de)']
+    assert localized['fr'][2].name == 'Genre 2 (fr)'
+    assert len(transport.urls) == 2
+
+
+def test_untranslated_models_read_from_the_model():
+    client = _client(_TranslatingTransport())
+    movie = isa.Movie({'id': 'not-upstream', 'title': 'Local only', 'runtime': 90}, client)
+    localized = client.localize([movie], ['de'])['de'][0]
+    assert localized.title == 'Local only' and localized.runtime == 90 and localized.language == 'de'
+
+
+def test_clients_sharing_a_backend_keep_their_own_language(tmp_path):
+    backend = isa.SQLiteCacheBackend(str(tmp_path / 'cache.sqlite3'), commit_interval=0)
+    transport = _TranslatingTransport()
+    english = _client(transport, cache_backend=backend)
+    assert english.get_movie(movie_id='5')[0].title == 'Movie 5'
+    german = _client(transport, cache_backend=backend, language='de')
+    assert german.get_movie(movie_id='5')[0].title == 'Movie 5 (de)'
+    assert _client(transport, cache_backend=backend).get_movie(movie_id='5')[0].title == 'Movie 5'
+    assert backend.count('movies:en') == backend.count('movies:de') == 1
+    backend.close()
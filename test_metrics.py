@@ -0,0 +1,95 @@
+"""
+Metrics filled in by InstrumentedTransport, and their Prometheus rendering, against benchmark.ReplayTransport
+"""
+
+import requests
+
+import benchmark
+import international_showtimes_api as isa
+
+
+def _client(transport=None):
+    transport = (transport if transport else benchmark.ReplayTransport())
+    return isa.InternationalShowtimes(api_key='test', transport=transport, lazy=True, metrics=isa.Metrics())
+
+
+def test_requests_bytes_and_latency_per_endpoint():
+    transport = benchmark.ReplayTransport()
+    client = _client(transport)
+    client.get_all_current_movies()
+    client.get_genre(genre_name='Genre 1')
+    snapshot = client.metrics_snapshot()['requests']
+    assert snapshot['movies']['requests'] == 3 and snapshot['genres']['requests'] == 1
+    assert snapshot['movies']['bytes'] == sum(len(body) for body in _bodies(transport, 'movies'))
+    assert sum(snapshot['movies']['histogram'].values()) == 3
+    assert snapshot['movies']['errors'] == snapshot['movies']['not_modified'] == 0
+
+
+def _bodies(transport, endpoint):
+    url = f'https://api.internationalshowtimes.com/v4/{endpoint}?lang=en&per_page=100'
+    return [transport._body(f'{url}&page={page}')[1] for page in (1, 2, 3)]
+
+
+def test_revalidations_and_errors_are_counted_apart():
+    class _FlakyTransport(benchmark.ReplayTransport):
+        def get(self, url, headers=None, payload: dict = None, stream: bool = False):
+            if '/chains' in url:
+                return benchmark._Response(503)
+            return super().get(url, headers=headers, payload=payload, stream=stream)
+
+    client = _client(_FlakyTransport())
+    client.get_genre(genre_name='Genre 1')
+    client.cache.genres.clear()
+    client.get_genre(genre_name='Genre 1')  # revalidated with If-None-Match
+    client.get_chain(chain_id='1')
+    snapshot = client.metrics_snapshot()['requests']
+    assert snapshot['genres']['requests'] == 2 and snapshot['genres']['not_modified'] == 1
+    assert snapshot['chains']['requests'] == snapshot['chains']['errors'] == 1
+
+
+def test_callbacks_see_every_request():
+    events = []
+    client = _client()
+    client.metrics.add_callback(events.append)
+    client.get_cinemas(cinema_id='7')
+    assert [(event['endpoint'], event['status']) for event in events] == [('cinemas', 200)]
+    assert events[0]['bytes'] > 0 and events[0]['seconds'] >= 0
+
+
+def test_prometheus_text():
+    client = _client()
+    client.get_all_current_movies()
+    client.get_movie(movie_id='5')
+    lines = client.metrics_text().splitlines()
+    assert 'isa_requests_total{endpoint="movies"} 3' in lines
+    assert 'isa_request_duration_seconds_bucket{endpoint="movies",le="+Inf"} 3' in lines
+    assert 'isa_request_duration_seconds_count{endpoint="movies"} 3' in lines
+    assert '# TYPE isa_request_duration_seconds histogram' in lines
+    assert 'isa_cache_hits_total{entity="movies"} 1' in lines
+    assert 'isa_cache_entries{entity="movies"} 300' in lines
+    buckets = [int(line.rsplit(' ', 1)[1]) for line in lines
+               if line.startswith('isa_request_duration_seconds_bucket{endpoint="movies"')]
+    assert buckets == sorted(buckets)
+
+
+def test_serve_metrics():
+    client = _client()
+    client.get_genre(genre_name='Genre 1')
+    server = client.serve_metrics(port=0)
+    try:
+        response = requests.get(f'http://127.0.0.1:{server.server_address[1]}/metrics', timeout=10)
+        assert response.status_code == 200
+        assert 'isa_requests_total{endpoint="genres"} 1' in response.text.splitlines()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_no_metrics_without_a_metrics_object():
+    client = isa.InternationalShowtimes(api_key='test', transport=benchmark.ReplayTransport(), lazy=True)
+    client.get_genre(genre_name='Genre 1')
+    assert client.metrics_snapshot()['requests'] == {}
+    layer = client.transport
+    while hasattr(layer, 'transport'):
+        assert not isinstance(layer, isa.InstrumentedTransport)
+        layer = layer.transport
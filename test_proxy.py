@@ -0,0 +1,75 @@
+"""
+ShowtimesProxy served over HTTP in front of benchmark.ReplayTransport
+"""
+
+import threading
+
+import pytest
+import requests
+
+import benchmark
+import international_showtimes_api as isa
+import showtimes_proxy
+
+
+@pytest.fixture
+def proxy():
+    upstream = benchmark.ReplayTransport(latency=0.05)
+    proxy = showtimes_proxy.ShowtimesProxy(api_key='test', transport=upstream)
+    server = proxy.serve(port=0, background=True)
+    proxy.url = f'http://127.0.0.1:{server.server_address[1]}'
+    proxy.upstream_transport = upstream
+    yield proxy
+    server.shutdown()
+    server.server_close()
+
+
+def test_identical_concurrent_requests_become_one_upstream_request(proxy):
+    responses = []
+
+    def fetch():
+        responses.append(requests.get(f'{proxy.url}/genres?lang=en', timeout=10))
+
+    threads = [threading.Thread(target=fetch) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [response.status_code for response in responses] == [200] * 8
+    assert len({response.content for response in responses}) == 1
+    assert proxy.upstream_transport.requests == {'genres': 1}
+
+
+def test_etag_round_trip(proxy):
+    first = requests.get(f'{proxy.url}/v4/movies?lang=en&ids=1,2', timeout=10)
+    assert first.status_code == 200 and first.headers['X-Cache'] == 'MISS'
+    second = requests.get(f'{proxy.url}/movies?ids=1,2&lang=en', headers={'If-None-Match': first.headers['ETag']},
+                          timeout=10)
+    assert second.status_code == 304 and second.headers['X-Cache'] == 'HIT' and not second.content
+    assert proxy.upstream_transport.requests == {'movies': 1}
+
+
+def test_clients_share_the_proxy_cache(proxy):
+    for _ in range(3):
+        client = isa.InternationalShowtimes(api_key='ignored', base_url=proxy.url, lazy=True)
+        assert len(client.get_all_current_movies()) == 300
+        client.close()
+    assert proxy.upstream_transport.requests == {'movies': 3}  # three pages, once
+    assert proxy.stats()['requests'] == 9
+
+
+def test_unknown_routes_are_not_forwarded(proxy):
+    assert requests.get(f'{proxy.url}/accounts', timeout=10).status_code == 404
+    assert proxy.upstream_transport.request_count() == 0
+
+
+def test_response_cache_is_bounded_in_bytes():
+    upstream = benchmark.ReplayTransport()
+    policy = isa.CachePolicy(maxsize=1000, ttl=60, stale_ttl=0, max_bytes=64 * 1024)
+    proxy = showtimes_proxy.ShowtimesProxy(api_key='test', transport=upstream, cache_policies={'cinemas': policy})
+    for page in range(1, 21):
+        status, _, body = proxy.handle(f'/cinemas?lang=en&page={page}&per_page=100')
+        assert status == 200
+    stats = proxy.stats()['cache']['cinemas']
+    assert 0 < stats['bytes'] <= 64 * 1024
+    assert stats['size'] < 20 and stats['evictions'] > 0
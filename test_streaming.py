@@ -0,0 +1,30 @@
+"""
+Memory of iter_showtimes and iter_cinemas, traced with tracemalloc as the replayed API grows
+"""
+
+import tracemalloc
+
+import pytest
+
+import benchmark
+import international_showtimes_api as isa
+
+
+def _stream_peak(scale: int, stream):
+    client = isa.InternationalShowtimes(api_key='test', transport=benchmark.ReplayTransport(scale=scale), lazy=True)
+    tracemalloc.start()
+    try:
+        count = sum(1 for _ in stream(client))
+        return count, tracemalloc.get_traced_memory()[1], client
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize('stream', [lambda client: client.iter_showtimes(skip_cinemas=True),
+                                    lambda client: client.iter_cinemas()], ids=['showtimes', 'cinemas'])
+def test_streaming_memory_stays_flat(stream):
+    small_count, small_peak, _ = _stream_peak(1, stream)
+    large_count, large_peak, client = _stream_peak(4, stream)
+    assert large_count == 4 * small_count
+    assert large_peak < 1.5 * small_peak
+    assert len(client.cache.showtimes) == 0 and len(client.cache.cinemas) == 0
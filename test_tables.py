@@ -0,0 +1,69 @@
+"""
+ColumnTable.save() and load(): every column kind, missing values, an empty table and the int -> str fallback
+"""
+
+import math
+
+import pytest
+
+import benchmark
+import international_showtimes_api as isa
+
+SPEC = {
+    'id': ('int', 'id', lambda record: record.get('id')),
+    'code': ('int', 'code', lambda record: record.get('code')),
+    'price': ('float', 'price', lambda record: record.get('price')),
+    'is_3d': ('bool', 'is_3d', lambda record: record.get('is_3d')),
+    'name': ('str', 'name', lambda record: record.get('name')),
+}
+
+RECORDS = [
+    {'id': 1, 'code': 7, 'price': 9.5, 'is_3d': True, 'name': 'Hall 1'},
+    {'id': '2', 'code': None, 'price': None, 'is_3d': None, 'name': None},
+    {'id': 3, 'code': 'X-12', 'price': math.nan, 'is_3d': False, 'name': 'Hall 1'},
+]
+
+
+def _round_trip(table, tmp_path):
+    path = str(tmp_path / 'table.cols')
+    table.save(path)
+    return isa.ColumnTable.load(path)
+
+
+def test_round_trip_keeps_every_kind_and_missing_values(tmp_path):
+    table = isa.ColumnTable.from_records(RECORDS, SPEC)
+    assert table.kinds == {'id': 'int', 'code': 'str', 'price': 'float', 'is_3d': 'bool', 'name': 'str'}
+    loaded = _round_trip(table, tmp_path)
+    assert len(loaded) == 3 and loaded.kinds == table.kinds
+    assert loaded.values('id') == [1, 2, 3]
+    assert loaded.values('code') == ['7', None, 'X-12']  # switched to str when 'X-12' came in
+    assert loaded.values('price') == [9.5, None, None]  # NaN reads back as missing
+    assert loaded.values('is_3d') == [True, None, False]
+    assert loaded.values('name') == ['Hall 1', None, 'Hall 1']
+    assert list(loaded.column('id')) == [1, 2, 3]
+    assert list(loaded.column('is_3d')) == [1, -1, 0]
+    assert list(loaded.column('name')) == [0, -1, 0] and loaded.dictionaries['name'] == ['Hall 1']
+    assert math.isnan(loaded.column('price')[1])
+
+
+def test_round_trip_of_an_empty_table(tmp_path):
+    loaded = _round_trip(isa.ColumnTable.from_records([], SPEC), tmp_path)
+    assert len(loaded) == 0
+    assert all(loaded.values(name) == [] for name in SPEC)
+    assert loaded.kinds['code'] == 'int'
+
+
+def test_round_trip_of_a_replayed_showtimes_table(tmp_path):
+    client = isa.InternationalShowtimes(api_key='test', transport=benchmark.ReplayTransport(), lazy=True)
+    table = client.showtimes_table()
+    loaded = _round_trip(table, tmp_path)
+    assert len(loaded) == len(table) == 5000
+    for name in isa.SHOWTIME_COLUMNS:
+        assert loaded.values(name) == table.values(name)
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.cols'
+    path.write_bytes(b'not a table at all')
+    with pytest.raises(Exception):
+        isa.ColumnTable.load(str(path))
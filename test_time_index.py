@@ -0,0 +1,68 @@
+"""
+TimeIndex and the Cache.showtimes_between / next_showtimes queries over showtimes replayed by ReplayTransport
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+import benchmark
+import international_showtimes_api as isa
+
+
+def test_time_index_keeps_each_group_sorted():
+    index = isa.TimeIndex(lambda value: value[0], lambda value: value[1])
+    values = {'a': ('x', 30.0), 'b': ('x', 10.0), 'c': ('x', 20.0), 'd': ('y', 15.0), 'e': ('x', 20.0),
+              'f': (None, 5.0), 'g': ('x', None)}
+    for key, value in values.items():
+        index.add(key, value)
+    assert index.between('x', 10.0, 30.0) == [(10.0, 'b'), (20.0, 'c'), (20.0, 'e')]
+    assert index.between('x', 20.0, 20.0) == []
+    assert list(index.after('x', 15.0)) == [(20.0, 'c'), (20.0, 'e'), (30.0, 'a')]
+    index.remove('c', values['c'])
+    index.remove('g', values['g'])  # never indexed
+    assert index.between('x', 0.0, 100.0) == [(10.0, 'b'), (20.0, 'e'), (30.0, 'a')]
+    index.remove('d', values['d'])
+    assert index.between('y', 0.0, 100.0) == [] and 'y' not in index._groups
+
+
+def _loaded_client():
+    transport = benchmark.ReplayTransport()
+    client = isa.InternationalShowtimes(api_key='test', transport=transport, lazy=True)
+    showtimes = client.get_showtimes(cinema=isa.Cinema({'id': '3'}, None), skip_cinemas=True)
+    assert showtimes
+    return client, transport, showtimes
+
+
+def test_window_and_next_queries_match_a_scan_without_requests():
+    client, transport, showtimes = _loaded_client()
+    sent = transport.request_count()
+    upcoming = sorted(showtimes, key=lambda showtime: (showtime.startTimestamp, showtime.id))
+    start, end = upcoming[2].startTimestamp, upcoming[-2].startTimestamp
+    expected = [showtime for showtime in upcoming if start <= showtime.startTimestamp < end]
+    window = client.cache.showtimes_between(datetime.fromtimestamp(start, timezone.utc), end, cinema_id='3')
+    assert len(window) >= 2 and [showtime.id for showtime in window] == [showtime.id for showtime in expected]
+    assert client.cache.next_showtimes(count=3, cinema_id='3') == upcoming[:3]
+    movie_id = upcoming[0].movieId
+    for showtime in client.cache.next_showtimes(count=5, cinema_id='3', movie_id=movie_id):
+        assert showtime.movieId == movie_id and showtime.cinemaId == '3'
+    assert transport.request_count() == sent
+
+
+def test_removed_and_expired_showtimes_drop_out():
+    client, _, showtimes = _loaded_client()
+    first, second = sorted(showtimes, key=lambda showtime: (showtime.startTimestamp, showtime.id))[:2]
+    del client.cache.showtimes[first.id]
+    assert client.cache.next_showtimes(count=1, cinema_id='3') == [second]
+    store = client.cache.showtimes
+    with store.lock:
+        value, stored_at = store._entries[second.id]
+        store._entries[second.id] = (value, stored_at - store.policy.ttl - 1)
+    assert second not in client.cache.next_showtimes(count=2, cinema_id='3')
+    assert second.id not in store
+
+
+def test_a_cinema_or_movie_is_required():
+    client, _, _ = _loaded_client()
+    with pytest.raises(Exception):
+        client.cache.next_showtimes(count=1)
@@ -0,0 +1,204 @@
+"""
+Offline request-count checks for the main workflows, run against benchmark.ReplayTransport
+
+Each workflow has an upstream request budget; a change that makes a workflow send more requests than its budget
+fails here instead of showing up as API quota or latency in production. Run with: python -m pytest -q
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import benchmark
+import international_showtimes_api as isa
+
+# workflow -> most upstream requests it may send against the default synthetic fixtures
+REQUEST_BUDGETS = {
+    'startup': 3,
+    'cinemas_by_city': 16,
+    'nearby_cinemas': 8,
+    'showtimes_for_cinemas': 40,
+    'showtimes_for_movie': 2,
+    'stream_showtimes': 50,
+    # 50 current-movie lists of 3 pages each, all but the first answered with 304, plus the genre and chain
+    # lists and the lookups of missing genre names, each made once
+    'reference_lookups': 166,
+    'sync_showtimes': 7,
+}
+
+
+@pytest.mark.parametrize('name', sorted(REQUEST_BUDGETS))
+def test_workflow_request_budget(name):
+    transport = benchmark.ReplayTransport()
+    benchmark.WORKFLOWS[name](transport)
+    assert 0 < transport.request_count() <= REQUEST_BUDGETS[name], transport.requests
+
+
+def test_reference_lookups_revalidate_instead_of_downloading():
+    transport = benchmark.ReplayTransport()
+    benchmark.WORKFLOWS['reference_lookups'](transport)
+    single = benchmark.ReplayTransport()
+    isa.InternationalShowtimes(api_key='test', transport=single, lazy=True).get_all_current_movies()
+    # the movie list is downloaded once; every later copy of it comes back as a bodiless 304
+    assert transport.bytes_sent < 2 * single.bytes_sent
+
+
+def _client(transport):
+    return isa.InternationalShowtimes(api_key='test', transport=transport, lazy=True)
+
+
+def test_city_search_goes_through_cities():
+    transport = benchmark.ReplayTransport()
+    cinemas = _client(transport).get_cinemas(city='Atlanta')
+    assert cinemas and all(cinema.city == 'Atlanta' for cinema in cinemas)
+    assert transport.requests['cities'] == 1
+    assert 'unknown' not in transport.requests
+
+
+def test_unknown_cinema_id_costs_one_request():
+    transport = benchmark.ReplayTransport()
+    client = _client(transport)
+    assert client.get_cinemas(cinema_id='does-not-exist') == []
+    assert client.get_cinemas(cinema_id='does-not-exist') == []
+    assert transport.request_count() == 1
+
+
+def test_streaming_one_short_page_costs_one_request():
+    transport = benchmark.ReplayTransport()
+    showtimes = list(_client(transport).iter_showtimes(cinema=isa.Cinema({'id': '3'}, None), skip_cinemas=True))
+    assert showtimes
+    assert transport.request_count() == 1
+
+
+class _FailingPageTransport(benchmark.ReplayTransport):
+    def get(self, url, headers=None, payload: dict = None, stream: bool = False):
+        if 'page=2&' in url:
+            return benchmark._Response(503)
+        return super().get(url, headers=headers, payload=payload, stream=stream)
+
+
+def test_a_failed_page_fails_the_whole_list(tmp_path):
+    backend = isa.SQLiteCacheBackend(str(tmp_path / 'cache.sqlite3'))
+    client = isa.InternationalShowtimes(api_key='test', transport=_FailingPageTransport(), lazy=True,
+                                        cache_backend=backend)
+    assert client.get_all_current_movies() == []
+    assert client.get_cinemas() == []
+    assert not client.cache.has_warm_movies()
+    with pytest.raises(Exception):
+        list(client.iter_pages('movies'))
+    with pytest.raises(Exception):
+        list(client.iter_cinemas())
+    backend.close()
+
+
+def test_nearby_queries_reuse_a_loaded_area():
+    transport = benchmark.ReplayTransport()
+    client = _client(transport)
+    client.get_cinemas(latitude=33.8, longitude=-84.4, nearest=5)
+    loaded = transport.request_count()
+    assert client.get_cinemas(latitude=33.801, longitude=-84.401, nearest=5)
+    assert transport.request_count() == loaded
+
+
+def test_stale_movies_refresh_in_batches():
+    transport = benchmark.ReplayTransport()
+    client = isa.InternationalShowtimes(api_key='test', transport=transport, lazy=True,
+                                        cache_policies={'movies': isa.CachePolicy(5000, 0, 60)})
+    movies = client.get_all_current_movies()
+    transport.requests.clear()
+    for movie in movies:
+        client.cache.movies.get(movie.id)
+    store = client.cache.movies
+    for _ in range(200):  # the refresh worker runs in the background
+        with store.lock:
+            if store._refresher is None:
+                break
+        time.sleep(0.01)
+    assert transport.requests['movies'] <= -(-len(movies) // isa._IDS_PER_REQUEST)
+
+
+def test_scheduler_charges_every_request_of_a_refresh():
+    transport = benchmark.ReplayTransport()
+    client = _client(transport)
+    scheduler = isa.RefreshScheduler(client, requests_per_minute=2, prefetch_hour=None)
+    query = client._showtimes_query()  # every showtimes, several pages plus hydration
+    scheduler.touch('showtimes', isa.normalize_url(query), query)
+    scheduler._updated -= 60
+    sent = scheduler.run_once()
+    assert sent == transport.request_count() == scheduler.stats()['requests'] > 2
+    # the overspent budget is paid back before anything else goes out
+    assert scheduler.run_once() == 0
+    assert transport.request_count() == sent
+
+
+def test_reading_left_out_fields_completes_projected_models_in_batches():
+    transport = benchmark.ReplayTransport()
+    client = _client(transport)
+    movies = client.get_all_current_movies(fields='minimal')
+    transport.requests.clear()
+    assert all(movie.summary is not None for movie in movies)
+    assert transport.requests['movies'] == -(-len(movies) // isa._IDS_PER_REQUEST)
+    cinemas = client.get_cinemas(fields='minimal')
+    transport.requests.clear()
+    client.complete(cinemas)
+    assert transport.requests['cinemas'] == -(-len(cinemas) // isa._IDS_PER_REQUEST)
+    assert all(cinema.website for cinema in cinemas)
+
+
+def test_async_id_helpers_batch_and_answer_cached_ids_first():
+    transport = benchmark.ReplayTransport()
+
+    async def fetch():
+        async with isa.AsyncInternationalShowtimes(api_key='test', transport=transport) as client:
+            ids = [str(movie_id) for movie_id in range(200)]
+            first = await client.get_movies(ids + ['does-not-exist'])
+            sent = transport.request_count()
+            again = await client.get_movies(ids + ['does-not-exist'])
+            return first, again, sent
+
+    first, again, sent = asyncio.run(fetch())
+    assert sent == 200 // isa._IDS_PER_REQUEST + 1
+    assert transport.request_count() == sent
+    assert all(first[movie_id][0].id == movie_id for movie_id in map(str, range(200)))
+    assert first['does-not-exist'] == [] and again == first
+
+
+def test_scheduler_does_not_charge_requests_from_other_threads():
+    class _BusyTransport(benchmark.ReplayTransport):
+        # a foreground request from another thread lands while the scheduler's first request is in flight
+        def get(self, url, headers=None, payload: dict = None, stream: bool = False):
+            if '/showtimes' in url and not self.requests.get('showtimes'):
+                thread = threading.Thread(target=client.get_cinemas, kwargs={'cinema_id': '7'})
+                thread.start()
+                thread.join()
+            return super().get(url, headers=headers, payload=payload, stream=stream)
+
+    transport = _BusyTransport()
+    client = _client(transport)
+    scheduler = isa.RefreshScheduler(client, requests_per_minute=100, prefetch_hour=None)
+    query = client._showtimes_query()
+    scheduler.touch('showtimes', isa.normalize_url(query), query)
+    scheduler._updated -= 60
+    sent = scheduler.run_once()
+    assert transport.requests['cinemas'] >= 1
+    assert sent == transport.request_count() - 1
+    assert isinstance(client.transport, isa.ConditionalTransport)
+
+
+def test_stale_chains_past_the_first_page_are_refreshed():
+    transport = benchmark.ReplayTransport()
+    client = _client(transport)
+    assert client.get_chain(chain_id='450')
+    store = client.cache.chains
+    with store.lock:
+        chain, stored_at = store._entries['450']
+        store._entries['450'] = (chain, stored_at - store.policy.ttl - 1)
+    assert store.get('450') is chain  # stale, served while it is refreshed
+    for _ in range(200):
+        with store.lock:
+            if store._refresher is None:
+                break
+        time.sleep(0.01)
+    assert store.age('450') < 5